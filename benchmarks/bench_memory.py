@@ -0,0 +1,42 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rig_sample
+import rig_store
+
+# Usage: python benchmarks/bench_memory.py [num_requests]
+# Bytes per row of the flat request frame as the old CSV loader produced it
+# versus the typed schema rig_store applies at load time, for container sizing.
+DEFAULT_REQUESTS = 100_000
+
+def run(num_requests):
+    rigs, requests = rig_sample.generate_sample_data(
+        num_rigs=num_requests // 25 + 15, num_requests_per_rig=100, seed=0)
+    flat = rig_store.join_tables(rigs, requests).head(num_requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "rig_data.csv"
+        flat.to_csv(csv_path, index=False)
+        before = pd.read_csv(csv_path, parse_dates=rig_store.DATE_COLUMNS)
+        after = rig_store.import_csv(csv_path)
+
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'before_bytes_per_row': rig_store.memory_per_row(before),
+        'after_dtype': after.dtypes.astype(str),
+        'after_bytes_per_row': rig_store.memory_per_row(after)
+    })
+    print(f"{len(after)} requests")
+    print(report.round(1).to_string())
+    total_before = report['before_bytes_per_row'].sum()
+    total_after = report['after_bytes_per_row'].sum()
+    print(f"\nTotal bytes per row: {total_before:.1f} -> {total_after:.1f} "
+          f"({total_before / total_after:.1f}x smaller)")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
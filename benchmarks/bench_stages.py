@@ -0,0 +1,311 @@
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rig_capacity
+import rig_dataset
+import rig_export
+import rig_history
+import rig_import
+import rig_index
+import rig_metrics
+import rig_sample
+import rig_search
+import rig_snapshot
+import rig_store
+import rig_timeline
+import rig_views
+
+# Usage: python benchmarks/bench_stages.py [num_requests ...] [--save baseline.json]
+#                                          [--compare baseline.json] [--stages load filter ...]
+# Runs the dashboard's compute stages headlessly, in rerun order, against
+# synthetic Parquet tables and reports wall time and peak traced memory per
+# stage. A saved JSON baseline can be compared against later runs; stages
+# slower than the threshold make the run exit non-zero.
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+REGRESSION_THRESHOLD = 1.25
+# Differences below these are noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.005
+MIN_REGRESSION_MB = 1.0
+
+# Same defaults the dashboard starts with
+FILTER_DAYS = 30
+STATUS_FILTER = ['Active']
+PRIORITY_FILTER = ['High', 'Medium']
+DETAIL_PAGE_SIZE = 50
+
+# --- STAGES ---
+# Each stage reads what earlier stages left in ctx and stores its own result
+def stage_load(ctx):
+    ctx['rigs'] = rig_store.read_table(ctx['rigs_path'])
+    ctx['requests'] = rig_store.read_table(ctx['requests_path'], rig_store.DASHBOARD_COLUMNS)
+
+def stage_indexes(ctx):
+    # Built once per dataset version and cached by the dashboard
+    requests = ctx['requests']
+    ctx['windows'] = rig_index.WindowIndex.from_frame(requests, 'Start_Date', 'End_Date')
+    ctx['due_index'] = rig_index.DueDateIndex.from_requests(requests)
+    ctx['rollup'] = rig_metrics.KpiRollup.from_requests(requests)
+
+def stage_filter(ctx):
+    now = ctx['now']
+    ctx['view_rigs'] = rig_views.view_rig_names(ctx['rigs'], STATUS_FILTER)
+    positions = rig_views.filter_positions(
+        ctx['requests'], ctx['windows'], ctx['view_rigs'], PRIORITY_FILTER, 'overlapping',
+        now - pd.Timedelta(days=FILTER_DAYS), now + pd.Timedelta(days=FILTER_DAYS)
+    )
+    ctx['positions'] = positions
+    ctx['filtered'] = rig_views.take_rows(ctx['requests'], positions)
+
+def stage_kpis(ctx):
+    ctx['kpis'] = rig_metrics.compute_kpis(ctx['rigs'], ctx['requests'], now=ctx['now'],
+                                           rollup=ctx['rollup'], due_index=ctx['due_index'])
+
+def stage_alerts(ctx):
+    requests, due_index, now = ctx['requests'], ctx['due_index'], ctx['now']
+    urgent = requests.iloc[due_index.due_within(now, 3)]
+    ctx['urgent'] = rig_views.group_alerts_by_rig(urgent)
+    ctx['weekly'] = rig_views.weekly_summary(requests.iloc[due_index.due_within(now, 7, open_only=False)])
+
+def stage_timeline(ctx):
+    # Level-of-detail choice as in the dashboard's Auto mode; a date-filtered
+    # view buckets its own rows
+    filtered = ctx['filtered']
+    level, buckets = rig_timeline.choose_buckets(
+        rig_timeline.build_bucket_pyramid(filtered), len(filtered), 2 * FILTER_DAYS
+    )
+    if buckets is None:
+        ctx['gantt'] = rig_timeline.build_gantt_frame(ctx['rigs'], filtered)
+    else:
+        ctx['gantt'] = rig_timeline.build_bucket_frame(ctx['rigs'], buckets, level)
+
+def stage_gantt_full(ctx):
+    # Per-request bars for every row, the worst case of the timeline stage
+    ctx['gantt_full'] = rig_timeline.build_gantt_frame(ctx['rigs'], ctx['requests'])
+
+def stage_detailed_view(ctx):
+    # Sort the view, then format only the first page, as the dashboard does
+    filtered = ctx['filtered']
+    order = rig_views.sort_order(filtered, 'End_Date')
+    ctx['detailed'] = rig_views.detailed_view(filtered.iloc[order[:DETAIL_PAGE_SIZE]], ctx['rigs'])
+
+def stage_capacity(ctx):
+    # Sweep-line profile, built once per dataset version, then the heatmap
+    now = ctx['now']
+    ctx['capacity'] = rig_capacity.CapacityProfile(ctx['requests'])
+    ctx['heatmap'] = ctx['capacity'].heatmap(
+        'Headcount', ctx['view_rigs'], now - pd.Timedelta(days=FILTER_DAYS), now + pd.Timedelta(days=FILTER_DAYS))
+    ctx['conflicts'] = ctx['capacity'].num_conflicts(ctx['positions'])
+
+def stage_search(ctx):
+    # Token index, built on the first search of a dataset version, then lookups
+    index = rig_search.SearchIndex(ctx['requests'], ctx['rigs'])
+    ctx['search'] = [len(index.search(query)) for query in (ctx['requests']['Request_ID'].iloc[-1], "safety insp")]
+
+def stage_feed_lookup(ctx):
+    # Request_ID lookup, built once per full load when a CSV feed is applied
+    ctx['dataset'] = rig_dataset.Dataset(
+        None, ctx['rigs'], ctx['requests'], indexes=(ctx['windows'], ctx['due_index'], ctx['rollup']))
+    ctx['dataset'].id_positions()
+
+def stage_feed_delta(ctx):
+    # One request completed and one added through the feed
+    if 'dataset' not in ctx:
+        stage_feed_lookup(ctx)
+    rows = rig_store.join_tables(ctx['rigs'], ctx['requests'].iloc[[0, 1]])
+    rows.loc[0, 'Action_Complete'] = not rows.loc[0, 'Action_Complete']
+    rows.loc[1, 'Request_ID'] = "REQ-FEED"
+    ctx['updated'] = ctx['dataset'].apply_rows(None, rows)
+
+def stage_snapshot(ctx):
+    # Publish a new Arrow snapshot version, then map it as another worker would
+    ctx['snapshot_version'] = ctx.get('snapshot_version', 0) + 1
+    directory = ctx['requests_path'].parent / rig_snapshot.SNAPSHOT_DIR.name
+    dataset = rig_dataset.Dataset(ctx['snapshot_version'], ctx['rigs'], ctx['requests'],
+                                  indexes=(ctx['windows'], ctx['due_index'], ctx['rollup']))
+    rig_snapshot.publish(dataset, directory)
+    ctx['mapped'] = rig_snapshot.open_snapshot(ctx['snapshot_version'], directory)
+
+def stage_bulk_import(ctx):
+    # Chunked import of a flat CSV drop into empty Parquet tables. The drop is
+    # written by the first run, which is slower; repeats reuse it
+    directory = ctx['requests_path'].parent
+    drop = directory / "drop.csv"
+    if not drop.exists():
+        rig_store.join_tables(ctx['rigs'], ctx['requests']).to_csv(drop, index=False)
+    for path in (directory / "import_rigs.parquet", directory / "import_requests.parquet"):
+        path.unlink(missing_ok=True)
+    target = rig_import.ParquetTarget(directory / "import_rigs.parquet", directory / "import_requests.parquet")
+    ctx['import'] = rig_import.import_file(drop, target, reject_path=directory / "drop.rejects.csv").rows_imported
+
+def stage_history(ctx):
+    # A version with one request completed appended as a delta to a fresh
+    # history, then the KPIs read back as of that version
+    directory = ctx['requests_path'].parent / rig_history.HISTORY_DIR.name
+    shutil.rmtree(directory, ignore_errors=True)
+    store = rig_history.HistoryStore(directory)
+    store.record(ctx['rigs'], ctx['requests'], version='base', taken_at=ctx['now'] - pd.Timedelta(days=1))
+    requests = ctx['requests'].copy()
+    requests.iloc[0, requests.columns.get_loc('Action_Complete')] = True
+    store.record(ctx['rigs'], requests, version='next', taken_at=ctx['now'])
+    ctx['history'] = rig_history.HistoryStore(directory).kpis_at(ctx['now'])
+
+def export_frame(ctx):
+    return rig_store.join_tables(ctx['rigs'], rig_store.read_table(ctx['requests_path']))
+
+def stage_export_csv(ctx):
+    ctx['csv'] = len(rig_export.to_csv(export_frame(ctx)))
+
+def stage_export_excel(ctx):
+    ctx['excel'] = len(rig_export.to_excel(export_frame(ctx)))
+
+STAGES = {
+    'load': stage_load,
+    'indexes': stage_indexes,
+    'filter': stage_filter,
+    'kpis': stage_kpis,
+    'alerts': stage_alerts,
+    'timeline': stage_timeline,
+    'gantt_full': stage_gantt_full,
+    'detailed_view': stage_detailed_view,
+    'capacity': stage_capacity,
+    'search': stage_search,
+    'feed_lookup': stage_feed_lookup,
+    'feed_delta': stage_feed_delta,
+    'snapshot': stage_snapshot,
+    'bulk_import': stage_bulk_import,
+    'history': stage_history,
+    'export_csv': stage_export_csv,
+    'export_excel': stage_export_excel
+}
+
+# Stages later ones depend on; always run, even when not selected
+REQUIRED_STAGES = ['load', 'indexes', 'filter']
+
+# --- DATA ---
+def write_dataset(directory, num_requests, now):
+    rigs, requests = rig_sample.generate_sample_data(
+        num_rigs=num_requests // 10 + 15, num_requests_per_rig=19, seed=0, now=now)
+    requests = requests.head(num_requests)
+    rigs = rigs[rigs['Rig'].isin(requests['Rig'])]
+    rigs_path = Path(directory) / rig_store.RIGS_FILE.name
+    requests_path = Path(directory) / rig_store.REQUESTS_FILE.name
+    rig_store.write_tables(rigs, requests, rigs_path, requests_path)
+    return rigs_path, requests_path
+
+# --- MEASUREMENT ---
+def measure(stage, ctx, repeats, trace_memory):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stage(ctx)
+        timings.append(time.perf_counter() - start)
+    result = {'seconds': min(timings)}
+    if trace_memory:
+        # Separate traced pass; tracing slows the stage, so it is not timed
+        tracemalloc.start()
+        stage(ctx)
+        result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return result
+
+def run_size(num_requests, stages, trace_memory):
+    now = pd.Timestamp.now().floor('min')
+    repeats = 5 if num_requests <= 10_000 else 1
+    with tempfile.TemporaryDirectory() as tmp:
+        rigs_path, requests_path = write_dataset(tmp, num_requests, now)
+        ctx = {'now': now, 'rigs_path': rigs_path, 'requests_path': requests_path}
+        results = {}
+        for name, stage in STAGES.items():
+            if name in stages or name in REQUIRED_STAGES:
+                measured = measure(stage, ctx, repeats, trace_memory)
+                if name in stages:
+                    results[name] = measured
+    return len(ctx['requests']), results
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'timestamp': pd.Timestamp.now().isoformat(timespec='seconds')
+    }
+
+# --- BASELINE COMPARISON ---
+def ratio(after, before):
+    return after / before if before else float('inf')
+
+def compare(results, baseline, threshold):
+    # (size, stage, metric, baseline, current, ratio, regressed) per time and memory
+    rows = []
+    for size, stages in results.items():
+        for name, measured in stages.items():
+            before = baseline.get('results', {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            for metric, floor in (('seconds', MIN_REGRESSION_SECONDS), ('peak_mb', MIN_REGRESSION_MB)):
+                if metric not in measured or metric not in before:
+                    continue
+                change = ratio(measured[metric], before[metric])
+                regressed = change > threshold and measured[metric] - before[metric] > floor
+                rows.append((size, name, metric, before[metric], measured[metric], change, regressed))
+    return rows
+
+def print_results(results):
+    print(f"{'requests':>10} {'stage':<14} {'time (s)':>10} {'peak (MB)':>10}")
+    for size, stages in results.items():
+        for name, measured in stages.items():
+            peak = f"{measured['peak_mb']:>10.1f}" if 'peak_mb' in measured else f"{'-':>10}"
+            print(f"{size:>10} {name:<14} {measured['seconds']:>10.4f} {peak}")
+
+def print_comparison(rows, threshold):
+    print(f"\n{'requests':>10} {'stage':<14} {'metric':<8} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, name, metric, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>10} {name:<14} {metric:<8} {before:>10.4f} {after:>10.4f} {change:>6.2f}x{flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"\n{regressions} regression(s) above {threshold:.2f}x")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's compute stages")
+    parser.add_argument('sizes', nargs='*', type=int, default=SIZES, help="request counts to run")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--save', type=Path, help="write results as a JSON baseline")
+    parser.add_argument('--compare', type=Path, help="compare against a saved JSON baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio reported as a regression")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak-memory pass")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        # JSON object keys are strings; use the same keys in memory
+        num_requests, results[str(size)] = run_size(size, args.stages, not args.no_memory)
+        print(f"{num_requests} requests done", file=sys.stderr)
+    print_results(results)
+
+    if args.save:
+        args.save.write_text(json.dumps({'environment': environment(), 'results': results}, indent=2))
+        print(f"\nBaseline saved to {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if print_comparison(compare(results, baseline, args.threshold), args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rig_sample
+import rig_store
+import rig_timeline
+
+# Usage: python benchmarks/bench_timeline.py [num_requests ...]
+SIZES = [1_000, 10_000, 100_000]
+
+# --- PREVIOUS ROW-BY-ROW BUILDER (baseline) ---
+def build_gantt_frame_iterrows(rigs, requests):
+    gantt_data = []
+    for _, row in rigs[rigs['Rig'].isin(requests['Rig'])].iterrows():
+        gantt_data.append(dict(
+            Task=row['Rig'],
+            Start=row['Rig_Start'],
+            Finish=row['Rig_End'],
+            Resource="Rig Operation",
+            Details=f"Status: {row['Rig_Status']}",
+            ID=row['Rig'],
+            Priority=""
+        ))
+    for _, row in requests.iterrows():
+        gantt_data.append(dict(
+            Task=row['Rig'],
+            Start=row['Start_Date'],
+            Finish=row['End_Date'],
+            Resource=row['Action_Requested'],
+            Details=f"{row['Requestor']} | {row['Action_Requested']}",
+            ID=row['Request_ID'],
+            Priority=row['Priority']
+        ))
+    return pd.DataFrame(gantt_data)
+
+def make_tables(num_requests):
+    rigs, requests = rig_sample.generate_sample_data(
+        num_rigs=num_requests // 25 + 15, num_requests_per_rig=100, seed=0)
+    requests = requests.head(num_requests)
+    return rig_store.apply_schema(rigs), rig_store.apply_schema(requests)
+
+def best_of(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def run(sizes):
+    print(f"{'requests':>10} {'stage':<16} {'before (s)':>11} {'after (s)':>10} {'speedup':>8}")
+    for size in sizes:
+        rigs, requests = make_tables(size)
+        repeats = 3 if size <= 10_000 else 1
+
+        before, old_frame = best_of(lambda: build_gantt_frame_iterrows(rigs, requests), repeats)
+        after, new_frame = best_of(lambda: rig_timeline.build_gantt_frame(rigs, requests), repeats)
+        pd.testing.assert_frame_equal(old_frame[rig_timeline.GANTT_COLUMNS], new_frame, check_dtype=False)
+        print(f"{len(requests):>10} {'gantt frame':<16} {before:>11.4f} {after:>10.4f} {before / after:>7.1f}x")
+
+        # Whole timeline section per rerun: frame construction plus figure
+        figure, _ = best_of(lambda: rig_timeline.build_timeline_figure(new_frame), repeats)
+        print(f"{len(requests):>10} {'frame + figure':<16} {before + figure:>11.4f} {after + figure:>10.4f} "
+              f"{(before + figure) / (after + figure):>7.1f}x")
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or SIZES)
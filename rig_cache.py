@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- SHARED LRU CACHE ---
+class LruCache:
+    # Bounded least-recently-used cache with hit/miss/eviction counters. One
+    # instance is shared by every session of a server process, so all access
+    # goes through a lock.
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        # Computed outside the lock so one slow miss does not stall other
+        # sessions; two sessions missing the same key at once both compute it
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+def read_only(positions):
+    # Cached row positions are shared between sessions; freeze them so no
+    # session can alter another's view
+    if isinstance(positions, np.ndarray):
+        positions.flags.writeable = False
+    return positions
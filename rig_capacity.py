@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import rig_store
+
+# --- SWEEP-LINE LOAD ENGINE ---
+# Concurrent load per rig, in the units of these request columns
+MEASURES = {'Headcount': 'Team_Size', 'Cost': 'Cost_Estimate'}
+CAPACITY_COLUMNS = ['Request_ID', 'Rig', 'Start_Date', 'End_Date', 'Team_Size', 'Cost_Estimate']
+# Heatmap rows; the rigs with the highest peak in the window are shown
+HEATMAP_RIGS = 40
+BUCKET_LABELS = {'day': "Day", 'week': "Week"}
+
+def measure_values(requests, column):
+    # Older tables may predate the column; missing values add no load
+    if column not in requests.columns:
+        return np.zeros(len(requests))
+    return requests[column].astype('float64').fillna(0).to_numpy()
+
+class CapacityProfile:
+    # Every request contributes a +load event at Start_Date and a -load event
+    # at End_Date. One sort orders all events by (rig, time, starts before
+    # ends), after which a cumulative sum is the running load of each rig:
+    # every rig's events net to zero, so no per-rig reset is needed. Windows
+    # are closed, as in the overlap filter, so requests that touch count as
+    # concurrent. O(n log n) overall, against O(n^2) pairwise checks.
+    def __init__(self, requests):
+        rig = requests['Rig'].astype('category')
+        self.rig_names = rig.cat.categories
+        codes = rig.cat.codes.to_numpy()
+        starts = requests['Start_Date'].to_numpy(dtype='datetime64[ns]')
+        ends = requests['End_Date'].to_numpy(dtype='datetime64[ns]')
+        num_requests = len(requests)
+
+        event_rigs = np.concatenate([codes, codes])
+        event_times = np.concatenate([starts, ends])
+        is_end = np.repeat([False, True], num_requests)
+        order = np.lexsort((is_end, event_times, event_rigs))
+        self.rigs = event_rigs[order]
+        self.times = event_times[order]
+        # Level right after each event; at a start it includes the instant
+        # where touching windows overlap
+        self.levels = {}
+        for measure, column in MEASURES.items():
+            values = measure_values(requests, column)
+            deltas = np.concatenate([values, -values])[order]
+            self.levels[measure] = np.cumsum(deltas)
+        self.conflicts = conflict_sets(codes, starts, ends)
+
+    def peaks(self, measure):
+        # Per rig: highest load and the interval it holds, from the event
+        # that reaches it to the next one (always the end of some request)
+        levels = self.levels[measure]
+        if not len(levels):
+            return pd.DataFrame(columns=['Rig', 'Peak', 'From', 'Until'])
+        # Events are grouped by rig, so per-rig maxima are segment reductions
+        firsts = np.flatnonzero(np.r_[True, self.rigs[1:] != self.rigs[:-1]])
+        highest = np.maximum.reduceat(levels, firsts)
+        counts = np.diff(np.r_[firsts, len(levels)])
+        reached = np.flatnonzero(levels == np.repeat(highest, counts))
+        at = reached[np.unique(self.rigs[reached], return_index=True)[1]]
+        until = np.minimum(at + 1, len(levels) - 1)
+        return pd.DataFrame({
+            'Rig': self.rig_names[self.rigs[at]],
+            'Peak': levels[at].round(2),
+            'From': self.times[at],
+            'Until': self.times[until]
+        })
+
+    def heatmap(self, measure, rigs=None, start=None, end=None, freq='week'):
+        # Highest load per rig (rows) and day or week bucket (columns), for
+        # the HEATMAP_RIGS rigs with the highest load in the window
+        levels = self.levels[measure]
+        keep = np.ones(len(levels), dtype=bool)
+        if rigs is not None:
+            wanted = self.rig_names.get_indexer(pd.Index(list(rigs), dtype=object))
+            keep &= np.isin(self.rigs, wanted[wanted >= 0])
+        if end is not None:
+            keep &= self.times <= pd.Timestamp(end).to_datetime64()
+        events = pd.DataFrame({'Rig': self.rigs[keep], 'Time': self.times[keep], 'Level': levels[keep]})
+        if events.empty:
+            return pd.DataFrame()
+        events['Bucket'] = bucket_starts(events['Time'], freq)
+        first = events['Bucket'].min() if start is None else bucket_starts(pd.Series([pd.Timestamp(start)]), freq)[0]
+        last = events['Bucket'].max() if end is None else bucket_starts(pd.Series([pd.Timestamp(end)]), freq)[0]
+
+        # Load carried into the window from events before it
+        before = events['Bucket'] < first
+        carried = events[before].groupby('Rig')['Level'].last()
+        events = events[~before]
+        top = (pd.concat([events.groupby('Rig')['Level'].max(), carried])
+               .groupby(level=0).max().nlargest(HEATMAP_RIGS).index)
+        events = events[events['Rig'].isin(top)]
+        carried = carried[carried.index.isin(top)]
+
+        buckets = pd.date_range(first, last, freq='7D' if freq == 'week' else 'D')
+        grouped = events.groupby(['Rig', 'Bucket'])['Level']
+        peak = grouped.max().unstack().reindex(index=top, columns=buckets)
+        closing = grouped.last().unstack().reindex(index=top, columns=buckets)
+        # A bucket without events stays at the level the last one closed on
+        opening = closing.ffill(axis=1).shift(1, axis=1)
+        opening[buckets[0]] = carried.reindex(top)
+        opening = opening.ffill(axis=1)
+        heat = np.fmax(peak, opening).fillna(0)
+
+        heat = heat.loc[heat.max(axis=1).sort_values(ascending=False).index]
+        heat.index = self.rig_names[heat.index]
+        return heat
+
+    def conflict_table(self, requests, positions=None, limit=None):
+        # One row per conflict set touching the given rows (all by default),
+        # largest first: its rig, size, span and request IDs
+        sets = self.conflicts if positions is None else self.conflicts[positions]
+        sets = np.unique(sets[sets >= 0])
+        sizes = np.bincount(self.conflicts[self.conflicts >= 0], minlength=len(self.conflicts))[sets]
+        sets = sets[np.argsort(-sizes, kind='stable')][:limit]
+        in_sets = np.isin(self.conflicts, sets)
+        members = rig_store.take_rows(requests, np.flatnonzero(in_sets)).assign(Set=self.conflicts[in_sets])
+        table = members.groupby('Set').agg(
+            Rig=('Rig', 'first'),
+            Requests=('Request_ID', 'count'),
+            From=('Start_Date', 'min'),
+            Until=('End_Date', 'max'),
+            Request_IDs=('Request_ID', ", ".join)
+        )
+        return table.sort_values(['Requests', 'From'], ascending=[False, True]).reset_index(drop=True)
+
+    def num_conflicts(self, positions=None):
+        # (conflict sets, requests in them) touching the given rows
+        sets = self.conflicts if positions is None else self.conflicts[positions]
+        sets = np.unique(sets[sets >= 0])
+        return len(sets), int(np.count_nonzero(np.isin(self.conflicts, sets)))
+
+def bucket_starts(times, freq):
+    # Day, or Monday of the week, as in the timeline pyramid
+    day = times.dt.floor('D')
+    if freq == 'week':
+        return day - pd.to_timedelta(day.dt.dayofweek, unit='D')
+    return day
+
+def conflict_sets(codes, starts, ends):
+    # Requests on a rig that overlap directly or through a chain share a set
+    # id; requests that overlap nothing get -1. Sorted by (rig, start), a
+    # request opens a new set when it starts after every earlier window of
+    # its rig has ended
+    order = np.lexsort((starts, codes))
+    rigs, sorted_starts = codes[order], starts[order]
+    reach = pd.Series(ends[order]).groupby(rigs).cummax().to_numpy()
+    opens = np.ones(len(order), dtype=bool)
+    opens[1:] = (rigs[1:] != rigs[:-1]) | (sorted_starts[1:] > reach[:-1])
+    groups = np.cumsum(opens) - 1
+    sizes = np.bincount(groups) if len(groups) else np.zeros(0, dtype=np.intp)
+    sets = np.full(len(order), -1, dtype=np.intp)
+    sets[order] = np.where(sizes[groups] > 1, groups, -1)
+    return sets
+
+# --- HEATMAP FIGURE ---
+def build_heatmap_figure(heat, measure, freq='week'):
+    fig = px.imshow(
+        heat,
+        aspect='auto',
+        color_continuous_scale='YlOrRd',
+        labels=dict(x=BUCKET_LABELS[freq], y="Rig", color=measure),
+        title=f"Peak concurrent {measure.lower()} per rig",
+        height=max(300, 22 * len(heat) + 120)
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12)
+    )
+    return fig
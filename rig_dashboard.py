@@ -1,14 +1,33 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
-import random
 import time
 import base64
-from io import BytesIO
 import json
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import rig_cache
+import rig_capacity
+import rig_dataset
+import rig_export
+import rig_history
+import rig_ingest
+import rig_import
+import rig_index
+import rig_metrics
+import rig_perf
+import rig_sample
+import rig_search
+import rig_snapshot
+import rig_sqlite
+import rig_store
+import rig_timeline
+import rig_views
+import rig_watch
 
 # --- PAGE CONFIG WITH CUSTOM FAVICON ---
 st.set_page_config(
@@ -223,110 +242,368 @@ def login_screen():
                     st.error("❌ Invalid credentials. Please try again.")
 
 # --- DATA MANAGEMENT WITH ENHANCED FEATURES ---
-def load_data():
-    data_file = Path("rig_data.csv")
-    config_file = Path("app_config.json")
-    
-    # Load or create config
-    if config_file.exists():
-        with open(config_file, 'r') as f:
-            config = json.load(f)
+RIGS_FILE = rig_store.RIGS_FILE
+REQUESTS_FILE = rig_store.REQUESTS_FILE
+CONFIG_FILE = Path("app_config.json")
+DB_FILE = rig_sqlite.DB_FILE
+
+# 'parquet' keeps the columnar files; 'sqlite' pushes filters down into rig_data.db
+STORAGE_BACKENDS = ('parquet', 'sqlite')
+
+# Alerts due within this many days are urgent; longer lists are paged or grouped
+URGENT_DAYS = 3
+ALERT_PAGE_SIZE = 10
+# Rows per page of the detailed request table
+DETAIL_PAGE_SIZES = [25, 50, 100, 250]
+
+# Date filter semantics: fully inside the range, touching it, or in progress at one moment
+DATE_FILTER_CHOICES = {
+    "Contained in range": 'contained',
+    "Overlapping range": 'overlapping',
+    "Active at instant": 'active'
+}
+
+EXPORT_SCOPES = {"Full dataset": 'full', "Current filtered view": 'view'}
+
+# Per-section rerun timings are mirrored here; "metrics_file" in the config
+# overrides it, a .jsonl name switches to JSON lines and "" turns it off
+METRICS_FILE = "dashboard_metrics.prom"
+
+# Open sessions rerun at most this often after the data files change;
+# "refresh_seconds" in the config overrides it
+REFRESH_SECONDS = 10
+
+# KPIs compared against this many days back by default
+HISTORY_COMPARE_DAYS = 7
+# Cards of the point-in-time comparison; a rise is bad for the inverse ones
+HISTORY_CARDS = [
+    ("Overdue Tasks", 'overdue_tasks', "inverse"),
+    ("Upcoming Tasks", 'upcoming_tasks', "off"),
+    ("Completion Rate", 'completion_rate', "normal"),
+    ("Total Requests", 'total_requests', "off")
+]
+
+# Largest conflict sets listed under the capacity heatmap
+CONFLICT_ROWS = 20
+
+# Filtered views kept per process, across sessions and dataset versions
+FILTER_CACHE_ENTRIES = 64
+
+# Timeline detail choices; None lets the visible range and row count decide
+TIMELINE_DETAIL_LEVELS = {"Auto": None, "Per request": 'request', "Daily": 'day', "Weekly": 'week'}
+
+def file_signature(path):
+    # mtime + size identify one version of a file on disk; the cached readers
+    # below are keyed on it so a rewrite of the file invalidates them
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_config(path, signature):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+@st.cache_resource(show_spinner=False)
+def shared_dataset():
+    # One per server process. cache_data would hand every session and rerun
+    # its own unpickled copy; this object is shared, not copied
+    return rig_dataset.SharedDataset()
+
+@st.cache_resource(show_spinner=False)
+def filter_cache():
+    # Filter results keyed by (dataset version, normalized filter state): row
+    # positions for the shared dataset, result frames for SQLite
+    return rig_cache.LruCache(FILTER_CACHE_ENTRIES)
+
+@st.cache_resource(show_spinner=False)
+def history_recorder(directory):
+    # One store and background recorder per process and history directory
+    return rig_history.HistoryRecorder(rig_history.HistoryStore(directory))
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def daily_history(directory, today):
+    # Past days never change, so this rolls at most once a day per process
+    return history_recorder(directory).store.daily_kpis(today)
+
+@st.cache_resource(show_spinner=False)
+def metrics_sink(path):
+    # One per process and metrics file; aggregates the reruns of every session
+    return rig_perf.MetricsSink(path)
+
+def session_manager():
+    # Streamlit has no public way to rerun another session, so this reaches
+    # into the runtime; None on a release without it, and live refresh is off
+    if not Runtime.exists():
+        return None
+    manager = getattr(Runtime.instance(), '_session_mgr', None)
+    return manager if hasattr(manager, 'get_active_session_info') else None
+
+def rerun_session(session_id):
+    # Reruns a session from outside its script thread, keeping its widget
+    # state, the same way Streamlit reruns on a source edit with runOnSave
+    manager = session_manager()
+    session_info = manager.get_active_session_info(session_id) if manager is not None else None
+    if session_info is not None:
+        session_info.session.request_rerun(None)
+
+def refresh_scheduler(paths):
+    # One watcher and scheduler per process; switching the backend or feed
+    # stops the threads watching the old files
+    return rig_watch.shared_scheduler(paths, rerun_session)
+
+def watched_files(storage, feed=None):
+    if storage == 'sqlite':
+        # Commits land in the write-ahead log before the main file
+        return (DB_FILE, DB_FILE.with_name(DB_FILE.name + "-wal"))
+    return (RIGS_FILE, REQUESTS_FILE) + ((feed,) if feed is not None else ())
+
+def load_dataset(version, feed=None, snapshots=None):
+    # Mapped from the snapshot another server process published, if any
+    if snapshots is not None:
+        dataset = rig_snapshot.open_snapshot(version, snapshots)
+        if dataset is not None:
+            return dataset
+    # Only the request columns the dashboard renders are loaded
+    dataset = rig_dataset.Dataset.load(version, RIGS_FILE, REQUESTS_FILE, rig_store.DASHBOARD_COLUMNS)
+    if feed is not None and feed.exists():
+        dataset = rig_ingest.apply_feed(dataset, version, feed)
+    if snapshots is None:
+        return dataset
+    # Published for the other processes, then mapped back so that this one
+    # drops its parsed copy too
+    rig_snapshot.publish(dataset, snapshots)
+    return rig_snapshot.open_snapshot(version, snapshots) or dataset
+
+def update_dataset(current, version, feed, snapshots=None):
+    # Tables untouched and only the feed moved: apply just its new or changed
+    # rows. Anything else (tables rewritten, feed switched or removed) reloads
+    if feed is None or current.version[:3] != version[:3] or version[3] is None:
+        return None
+    if snapshots is not None:
+        dataset = rig_snapshot.open_snapshot(version, snapshots)
+        if dataset is not None:
+            return dataset
+    dataset = rig_ingest.apply_feed(current, version, feed)
+    if snapshots is not None:
+        # Kept in memory here, with the views it carried over; the other
+        # processes map it instead of applying the delta themselves
+        rig_snapshot.publish(dataset, snapshots)
+    return dataset
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_sqlite_rigs(path, version):
+    return rig_sqlite.read_rigs(path)
+
+def read_sqlite_view(path, filter_state):
+    # Only rows matching the filters leave SQLite
+    return rig_sqlite.read_requests(rig_store.DASHBOARD_COLUMNS, path, **sqlite_filters(filter_state))
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def read_sqlite_capacity(path, version):
+    # Shared, not copied, like the Parquet dataset's profile
+    requests = rig_sqlite.read_requests(rig_capacity.CAPACITY_COLUMNS, path)
+    return requests, rig_capacity.CapacityProfile(requests)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def sqlite_search_index(path, version):
+    rigs = read_sqlite_rigs(path, version)
+    return rig_search.SearchIndex(rig_sqlite.read_requests(rig_search.INDEX_COLUMNS, path), rigs)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def sqlite_filter_options(path, version):
+    # The search index would read every request; the choices need only rigs
+    return rig_search.filter_options(read_sqlite_rigs(path, version), rig_sqlite.priority_levels(path))
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_sqlite_pyramid(path, version):
+    return rig_timeline.pyramid_from_daily_counts(rig_sqlite.read_daily_counts(path))
+
+def sqlite_filters(filter_state):
+    date_mode, start, end, active_at, statuses, rig_names, priorities = filter_state
+    return dict(statuses=statuses, rigs=rig_names, priorities=priorities,
+                date_mode=date_mode, start=start, end=end, active_at=active_at)
+
+def storage_backend(config):
+    # RIG_STORAGE overrides the config file, e.g. per deployment
+    backend = os.environ.get('RIG_STORAGE') or config.get('storage', 'parquet')
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return backend
+
+def save_rig_data(rigs, requests, storage='parquet'):
+    if storage == 'sqlite':
+        # One transaction; the version bump invalidates the cached views
+        rig_sqlite.write_tables(rigs, requests, DB_FILE)
+        return
+    rig_store.write_tables(rigs, requests, RIGS_FILE, REQUESTS_FILE)
+    parquet_replaced()
+
+def parquet_replaced():
+    # Same-second rewrites of an equally sized file keep the signature on
+    # coarse-grained filesystems, so drop the shared dataset explicitly too,
+    # and the published snapshots, which are named after the signatures
+    shared_dataset().invalidate()
+    filter_cache().clear()
+    snapshots = snapshot_dir(load_config())
+    if snapshots is not None and snapshots.exists():
+        rig_snapshot.prune(snapshots, keep=0)
+
+def import_upload(upload, storage, reject_dir, progress=None):
+    # Streams an uploaded Excel or CSV drop into the data store in batches
+    if storage == 'sqlite':
+        target = rig_import.SqliteTarget(DB_FILE)
     else:
-        config = {"last_update": datetime.now().isoformat(), "version": "2.0"}
-        with open(config_file, 'w') as f:
+        target = rig_import.ParquetTarget(RIGS_FILE, REQUESTS_FILE)
+    report = rig_import.import_file(upload, target, progress=progress, reject_dir=reject_dir)
+    if storage != 'sqlite':
+        parquet_replaced()
+    return report
+
+def export_frame(dataset, positions=None, feed=None):
+    # Flat, all-column frame for exports; positions are rows of the shared
+    # dataset in a filtered view, so the export holds exactly the rows shown.
+    # The columns the dashboard does not load are read from disk, with the
+    # feed laid over them, and joined by Request_ID. Only runs when an export
+    # is not cached yet
+    requests = rig_views.take_rows(dataset.requests, positions)
+    extra = [col for col in rig_store.stored_columns(REQUESTS_FILE)
+             if col in rig_store.REQUEST_COLUMNS and col not in requests.columns]
+    if extra:
+        stored = rig_store.read_table(REQUESTS_FILE, ['Request_ID'] + extra)
+        if feed is not None and feed.exists():
+            stored = rig_ingest.overlay_rows(stored, rig_ingest.read_feed(feed)[0])
+        # Rows the feed no longer carries keep their dashboard columns and
+        # leave the others empty
+        requests = requests.astype({'Request_ID': object}).merge(stored, on='Request_ID', how='left')
+    return rig_store.join_tables(dataset.rigs, requests[[col for col in rig_store.REQUEST_COLUMNS
+                                                         if col in requests.columns]])
+
+def export_sqlite_frame(rigs, filter_state=None):
+    # Same flat layout, read with the view's filters pushed down
+    filters = {} if filter_state is None else sqlite_filters(filter_state)
+    return rig_store.join_tables(rigs, rig_sqlite.read_requests(path=DB_FILE, **filters))
+
+def load_config():
+    # Load or create config
+    if not CONFIG_FILE.exists():
+        config = {"last_update": datetime.now().isoformat(), "version": "2.0", "storage": "parquet", "metrics_file": METRICS_FILE}
+        with open(CONFIG_FILE, 'w') as f:
             json.dump(config, f)
+    return read_config(CONFIG_FILE, file_signature(CONFIG_FILE))
+
+def feed_file(config):
+    # Optional append-mostly CSV of flat rows upserted over the Parquet tables
+    path = config.get('csv_feed')
+    return Path(path) if path else None
+
+def snapshot_dir(config):
+    # Arrow snapshots shared by the server processes on this host; "" turns them off
+    path = config.get('snapshot_dir', str(rig_snapshot.SNAPSHOT_DIR))
+    return Path(path) if path else None
+
+def reject_dir(config):
+    # Where the rejected rows of uploaded imports are written
+    return Path(config.get('reject_dir', str(rig_import.REJECT_DIR)))
+
+def history_dir(config):
+    # Append-only KPI history; "" turns it off
+    path = config.get('history_dir', str(rig_history.HISTORY_DIR))
+    return Path(path) if path else None
+
+def load_data(storage, feed=None, snapshots=None):
+    if storage == 'sqlite':
+        # Requests stay in the database and are queried per filter state
+        if not rig_sqlite.database_exists(DB_FILE):
+            if rig_sqlite.migrate_from_store(DB_FILE) is None:
+                save_rig_data(*rig_sample.generate_sample_data(), storage=storage)
+        return read_sqlite_rigs(DB_FILE, rig_sqlite.data_version(DB_FILE)), None, None
     
-    if data_file.exists():
-        df = pd.read_csv(data_file, parse_dates=['Rig_Start', 'Rig_End', 'Start_Date', 'End_Date'])
-    else:
-        df = generate_sample_data()
-        df.to_csv(data_file, index=False)
-    
-    return df, config
-
-def generate_sample_data(num_rigs=15, num_requests_per_rig=4):
-    rig_names = [
-        "Deepwater Horizon", "Ocean Explorer", "Sea Guardian", "Marine Pioneer", 
-        "Offshore Venture", "Blue Wave", "Pacific Driller", "Atlantic Explorer",
-        "Coastal Defender", "North Star", "Southern Cross", "Eastern Horizon",
-        "Western Pioneer", "Arctic Explorer", "Pacific Guardian"
-    ]
-    
-    requestors = [
-        "Client A - Operations", "Client B - Procurement", "Supplier X - Logistics", 
-        "Internal Team - Maintenance", "Regulatory Body - Compliance", "Safety Officer",
-        "Technical Department", "Finance Division", "Environmental Team"
-    ]
-    
-    actions = [
-        "Supply Delivery", "Maintenance Schedule", "Safety Audit", "Personnel Change", 
-        "Data Submission", "Equipment Inspection", "Environmental Check", "Emergency Drill",
-        "System Upgrade", "Training Session", "Documentation Review", "Quality Assurance"
-    ]
+    if not rig_store.tables_exist(RIGS_FILE, REQUESTS_FILE):
+        # One-shot migration of the legacy flat store, or seed demo data
+        legacy = rig_store.legacy_source()
+        if legacy is not None:
+            rig_store.migrate(legacy, RIGS_FILE, REQUESTS_FILE)
+            shared_dataset().invalidate()
+            filter_cache().clear()
+        else:
+            save_rig_data(*rig_sample.generate_sample_data())
     
-    data = []
-
-    for i in range(num_rigs):
-        rig = rig_names[i] if i < len(rig_names) else f"Rig_{i+1:03d}"
-        
-        # Generate rig operational period
-        rig_start = pd.Timestamp.now() - pd.Timedelta(days=random.randint(0, 60))
-        rig_duration = pd.Timedelta(days=random.randint(30, 120))
-        rig_end = rig_start + rig_duration
-        overall_status = "Complete" if pd.Timestamp.now() > rig_end else "Active"
-
-        for _ in range(random.randint(1, num_requests_per_rig)):
-            # Generate requests within rig operational timeline
-            req_start_offset = random.randint(0, (rig_end - rig_start).days)
-            req_start = rig_start + pd.Timedelta(days=req_start_offset)
-            req_duration = pd.Timedelta(days=random.randint(1, 21))
-            req_end = req_start + req_duration
-            req_status = "Complete" if pd.Timestamp.now() > req_end else "Active"
-
-            request_data = {
-                "Rig": rig,
-                "Rig_Start": rig_start,
-                "Rig_End": rig_end,
-                "Rig_Status": overall_status,
-                "Request_ID": f"REQ-{random.randint(10000, 99999)}",
-                "Action_Requested": random.choice(actions),
-                "Requestor": random.choice(requestors),
-                "Start_Date": req_start,
-                "End_Date": req_end,
-                "Duration_Days": req_duration.days,
-                "Action_Doable": random.choice([True, False]),
-                "Action_Complete": req_status == "Complete",
-                "Response_Provided": random.choice([True, False]) if req_status == "Complete" else False,
-                "Priority": random.choice(["High", "Medium", "Low"]),
-                "Cost_Estimate": round(random.uniform(1000, 50000), 2),
-                "Team_Size": random.randint(1, 12),
-                "Risk_Level": random.choice(["Low", "Medium", "High"]),
-                "Environmental_Impact": random.choice(["None", "Low", "Medium", "High"])
-            }
-            data.append(request_data)
-
-    return pd.DataFrame(data)
+    # Read once per file version and shared by every rerun and session, and
+    # through snapshots by the other server processes; a change to the feed
+    # alone is applied as a delta to the current version
+    feed_version = file_signature(feed) if feed is not None and feed.exists() else None
+    version = (file_signature(RIGS_FILE), file_signature(REQUESTS_FILE), str(feed), feed_version)
+    dataset = shared_dataset().get(
+        version,
+        lambda version: load_dataset(version, feed, snapshots),
+        lambda current, version: update_dataset(current, version, feed, snapshots)
+    )
+    return dataset.rigs, dataset.requests, dataset
 
 # --- FILE EXPORT FUNCTIONS ---
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='RigOperations')
-        
-        # Add summary sheet
-        summary_data = {
-            'Metric': ['Total Rigs', 'Active Rigs', 'Completed Requests', 'Pending Actions'],
-            'Value': [
-                df['Rig'].nunique(),
-                len(df[df['Rig_Status'] == 'Active']),
-                len(df[df['Action_Complete'] == True]),
-                len(df[df['Action_Complete'] == False])
-            ]
-        }
-        pd.DataFrame(summary_data).to_excel(writer, index=False, sheet_name='Summary')
-    
-    processed_data = output.getvalue()
-    return processed_data
+@st.cache_data(show_spinner="Preparing export...", max_entries=8)
+def build_export(kind, export_key, _load_frame):
+    # Keyed by format, dataset version and filter state; the frame loader is
+    # not hashed and only runs on a cache miss
+    write = rig_export.EXPORT_FORMATS[kind][0]
+    return write(_load_frame())
+
+# --- TIMELINE ---
+def timeline_view(rigs, requests, level, load_pyramid, span_days, selection):
+    # (bar count, figure or None, caption or None); wide views draw
+    # pre-aggregated per-rig buckets instead of one bar per request
+    buckets = None
+    if level != 'request':
+        pyramid = load_pyramid()
+        if level is None:
+            level, buckets = rig_timeline.choose_buckets(pyramid, len(requests), span_days, **selection)
+        else:
+            buckets = rig_timeline.select_buckets(pyramid, level, **selection)
+
+    caption = None
+    if buckets is None:
+        gantt_df = rig_timeline.build_gantt_frame(rigs, requests)
+    else:
+        gantt_df = rig_timeline.build_bucket_frame(rigs, buckets, level)
+        caption = (
+            f"{rig_timeline.BUCKET_LABELS[level]} view: {int(buckets['Count'].sum())} requests "
+            f"in {len(buckets)} aggregate bars. Narrow the date range or rig selection for per-request bars."
+        )
+    figure = None if gantt_df.empty else rig_timeline.build_timeline_figure(gantt_df)
+    return len(gantt_df), figure, caption
+
+# --- CAPACITY ---
+def capacity_view(profile, requests, measure, rigs, start, end, span_days, positions):
+    # (heatmap figure or None, peak table, (conflict sets, requests in them),
+    # largest conflict sets) for the rigs and window in view
+    freq = 'day' if span_days is not None and span_days <= rig_timeline.DAILY_SPAN_DAYS else 'week'
+    heat = profile.heatmap(measure, rigs, start, end, freq)
+    figure = None if heat.empty else rig_capacity.build_heatmap_figure(heat, measure, freq)
+    peaks = profile.peaks(measure)
+    peaks = peaks[peaks['Rig'].isin(heat.index)].sort_values('Peak', ascending=False)
+    conflicts = profile.conflict_table(requests, positions, limit=CONFLICT_ROWS)
+    return figure, peaks, profile.num_conflicts(positions), conflicts
+
+# --- ALERT RENDERING ---
+def render_urgent_alerts(tasks, now):
+    # One markdown call for the whole batch instead of one per task
+    days_left = (tasks['End_Date'] - now).dt.days
+    due_dates = tasks['End_Date'].dt.strftime('%Y-%m-%d')
+    blocks = [
+        f'''
+        <div class="urgent-alert">
+            <b>🚨 URGENT ACTION REQUIRED:</b> {rig} - {action}<br>
+            <b>Due:</b> {left} days ({due}) | 
+            <b>Requested by:</b> {requestor} | 
+            <b>Priority:</b> {priority}
+        </div>
+        '''
+        for rig, action, left, due, requestor, priority in zip(
+            tasks['Rig'], tasks['Action_Requested'], days_left, due_dates,
+            tasks['Requestor'], tasks['Priority']
+        )
+    ]
+    st.markdown("".join(blocks), unsafe_allow_html=True)
 
 # --- APPLICATION INITIALIZATION ---
 if 'logged_in' not in st.session_state:
@@ -337,19 +614,37 @@ if not st.session_state.logged_in:
     st.stop()
 
 # --- MAIN APPLICATION ---
+# Each section below ends with a lap, so the laps add up to the whole rerun
+rerun_timer = rig_perf.RerunTimer()
 setup_theme()
 
-# Show loading animation
+# Load data under the loading animation; df is None with the SQLite
+# backend, which is queried per view
 with st.spinner('🚀 Loading Offshore Operations Dashboard...'):
-    time.sleep(1)
-
-# Load data
-df, config = load_data()
-
-# Ensure date columns are properly formatted
-date_columns = ['Rig_Start', 'Rig_End', 'Start_Date', 'End_Date']
-for col in date_columns:
-    df[col] = pd.to_datetime(df[col])
+    config = load_config()
+    storage = storage_backend(config)
+    feed = feed_file(config)
+    # Read before loading, so a change made during the load still refreshes
+    scheduler = refresh_scheduler(watched_files(storage, feed))
+    rendered_version = scheduler.watcher.version
+    rigs, df, dataset = load_data(storage, feed, snapshot_dir(config))
+# Filter choices are computed once per data version, not per rerun
+if storage == 'sqlite':
+    db_version = rig_sqlite.data_version(DB_FILE)
+    filter_options = sqlite_filter_options(DB_FILE, db_version)
+else:
+    filter_options = dataset.search.options
+# Every data version is appended to the history in the background
+history = history_dir(config)
+if history is not None:
+    recorder = history_recorder(history)
+    if storage == 'sqlite':
+        # Read when the recorder gets to it, which may already be a newer commit
+        recorder.submit(f"sqlite-{db_version}", lambda: (
+            rig_sqlite.read_rigs(DB_FILE), rig_sqlite.read_requests(rig_store.DASHBOARD_COLUMNS, DB_FILE)))
+    else:
+        recorder.submit(rig_snapshot.snapshot_name(dataset.version), lambda: (dataset.rigs, dataset.requests))
+rerun_timer.lap('load', len(rigs) if df is None else len(df))
 
 # --- SIDEBAR WITH ENHANCED CONTROLS ---
 with st.sidebar:
@@ -369,6 +664,17 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
+    refresh_seconds = config.get('refresh_seconds', REFRESH_SECONDS)
+    refresh_supported = session_manager() is not None
+    live_refresh = st.checkbox(
+        "📡 Live refresh",
+        value=refresh_supported,
+        disabled=not refresh_supported,
+        help=f"Refresh when the data changes on disk, at most every {refresh_seconds}s "
+             f"(watching via {scheduler.watcher.mode})" if refresh_supported else
+             "Not available with this Streamlit version; use the browser's rerun"
+    )
+    
     # Advanced filters
     st.markdown("### 🎯 Dashboard Filters")
     
@@ -378,60 +684,99 @@ with st.sidebar:
         help="Select the date range for viewing operations"
     )
     
+    date_filter_mode = st.selectbox(
+        "🧭 Date Filter Mode",
+        options=list(DATE_FILTER_CHOICES),
+        index=0,
+        help="Contained keeps requests entirely inside the range; Overlapping also keeps "
+             "requests that straddle its edges; Active at instant keeps requests in progress at one moment"
+    )
+    active_on = None
+    if DATE_FILTER_CHOICES[date_filter_mode] == 'active':
+        active_on = st.date_input(
+            "📍 Active On",
+            value=pd.Timestamp.now().date(),
+            help="Show requests in progress on this day at the current time of day"
+        )
+    
     st.session_state.status_filter = st.multiselect(
         "🔍 Rig Status",
-        options=df['Rig_Status'].unique(),
-        default=df['Rig_Status'].unique(),
+        options=filter_options['Rig_Status'],
+        default=filter_options['Rig_Status'],
         help="Filter by rig operational status"
     )
     
     st.session_state.rig_filter = st.multiselect(
         "🏗️ Select Rigs",
-        options=sorted(df['Rig'].unique()),
+        options=filter_options['Rig'],
         default=[],
         help="Select specific rigs to view"
     )
     
     priority_filter = st.multiselect(
         "🚨 Priority Level",
-        options=sorted(df['Priority'].unique()),
+        options=filter_options['Priority'],
         default=[],
         help="Filter by action priority level"
     )
     
+    timeline_detail = st.selectbox(
+        "🔭 Timeline Detail",
+        options=list(TIMELINE_DETAIL_LEVELS),
+        index=0,
+        help="Auto shows per-request bars for narrow views and daily or weekly aggregates for wide ones"
+    )
+    
     # Data management section
     st.markdown("---")
     st.markdown("### 💾 Data Management")
     
     if st.button("🔄 Generate Sample Data", help="Load demonstration data"):
         with st.spinner("Generating sample data..."):
-            df = generate_sample_data()
-            df.to_csv("rig_data.csv", index=False)
+            rigs, df = rig_sample.generate_sample_data()
+            save_rig_data(rigs, df, storage)
             st.success("Sample data loaded!")
             time.sleep(1)
             st.experimental_rerun()
     
-    # Export options
+    upload = st.file_uploader(
+        "📥 Bulk import",
+        type=['csv', 'xlsx'],
+        help="Excel or CSV with one row per request; rows are upserted by Request_ID"
+    )
+    if upload is not None and st.button("Import file"):
+        import_status = st.empty()
+        try:
+            with st.spinner("Importing..."):
+                st.session_state.import_report = import_upload(upload, storage, reject_dir(config), lambda report: import_status.caption(
+                    f"{report.rows_read:,} rows read, {report.rows_per_second:,.0f} rows/s"))
+        except ValueError as e:
+            st.error(f"Import failed: {e}")
+        import_status.empty()
+    # Kept across the rerun the new data triggers
+    import_report = st.session_state.get('import_report')
+    if import_report is not None:
+        st.success(f"Imported {import_report.rows_imported:,} of {import_report.rows_read:,} rows "
+                   f"({import_report.rows_per_second:,.0f} rows/s)")
+        if import_report.rows_rejected and import_report.reject_path.exists():
+            st.warning(f"{import_report.rows_rejected:,} rows rejected")
+            st.download_button(
+                "📥 Download rejected rows",
+                import_report.reject_path.read_bytes(),
+                file_name=import_report.reject_path.name,
+                mime="text/csv"
+            )
+    
+    # Export options; the buttons are filled in once the filters are applied
     st.markdown("### 📤 Export Data")
-    col1, col2 = st.columns(2)
-    with col1:
-        csv_data = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="CSV",
-            data=csv_data,
-            file_name="rig_operations.csv",
-            mime="text/csv",
-            help="Download data as CSV file"
-        )
-    with col2:
-        excel_data = to_excel(df)
-        st.download_button(
-            label="Excel",
-            data=excel_data,
-            file_name="rig_operations.xlsx",
-            mime="application/vnd.ms-excel",
-            help="Download data as Excel workbook"
-        )
+    export_scope = st.radio(
+        "Export scope",
+        options=list(EXPORT_SCOPES),
+        help="Export every request or only the rows matching the current filters"
+    )
+    export_panel = st.container()
+    # Filled in once the filters have run
+    cache_panel = st.container()
     
     # User info
     st.markdown("---")
@@ -443,39 +788,125 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
+    show_performance = st.checkbox(
+        "⏱️ Performance panel",
+        value=False,
+        help="Per-section timings of this rerun and totals for the server process"
+    )
+    
     if st.button("🚪 Logout"):
         st.session_state.logged_in = False
         st.experimental_rerun()
+rerun_timer.lap('sidebar')
 
 # --- APPLY FILTERS ---
-filtered_df = df.copy()
-if st.session_state.get('status_filter'):
-    filtered_df = filtered_df[filtered_df['Rig_Status'].isin(st.session_state.status_filter)]
-if st.session_state.get('rig_filter'):
-    filtered_df = filtered_df[filtered_df['Rig'].isin(st.session_state.rig_filter)]
-if priority_filter:
-    filtered_df = filtered_df[filtered_df['Priority'].isin(priority_filter)]
-
-# Filter by date range
+now = pd.Timestamp.now()
+
+range_start = range_end = span_days = None
 if len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df['Start_Date'] >= pd.Timestamp(date_range[0])) & 
-        (filtered_df['End_Date'] <= pd.Timestamp(date_range[1]))
-    ]
+    range_start, range_end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+    span_days = (range_end - range_start).days
+
+date_mode = DATE_FILTER_CHOICES[date_filter_mode]
+active_at = None
+if date_mode == 'active':
+    active_at = pd.Timestamp.combine(active_on, now.time()).floor('min')
+
+# Rigs left after the status and rig filters, used by the aggregated timeline
+view_rigs = rig_views.view_rig_names(rigs, st.session_state.get('status_filter'),
+                                     st.session_state.get('rig_filter'))
+
+# Normalized filter state and dataset version identify a filtered view
+filter_state = (
+    date_mode, range_start, range_end, active_at,
+    tuple(sorted(st.session_state.get('status_filter') or [])),
+    tuple(sorted(st.session_state.get('rig_filter') or [])),
+    tuple(sorted(priority_filter))
+)
+
+rig_windows = rig_index.WindowIndex.from_frame(rigs, 'Rig_Start', 'Rig_End')
+rigs_in_window = rigs
+if date_mode == 'active':
+    rigs_in_window = rigs.iloc[rig_windows.active_at(active_at)]
+elif range_start is not None:
+    rigs_in_window = rigs.iloc[rig_windows.query(date_mode, range_start, range_end)]
+
+if storage == 'sqlite':
+    # Every filter runs as an indexed SQL predicate; only matching rows are read
+    data_version = ('sqlite', db_version)
+    filtered_df = filter_cache().get_or_compute(
+        ('sqlite', db_version, filter_state), lambda: read_sqlite_view(DB_FILE, filter_state))
+else:
+    data_version = dataset.version
+    # Filtering yields row positions into the shared frame; they are cached
+    # across sessions, so unrelated widget changes and repeat views skip it.
+    # Only the matching rows are materialized for this session
+    rig_filtered = st.session_state.get('status_filter') or st.session_state.get('rig_filter')
+    positions = filter_cache().get_or_compute((data_version, filter_state), lambda: rig_cache.read_only(
+        rig_views.filter_positions(df, dataset.windows, view_rigs if rig_filtered else None,
+                                   priority_filter, date_mode, range_start, range_end, active_at)
+    ))
+    filtered_df = rig_views.take_rows(df, positions)
+
+with cache_panel:
+    cache_stats = filter_cache().stats()
+    st.caption(
+        f"Filter cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+        f"{cache_stats['evictions']} evictions ({cache_stats['entries']}/{cache_stats['max_entries']} views)"
+    )
+rerun_timer.lap('filters', len(filtered_df))
+
+# --- EXPORTS ---
+# Nothing is serialized until a Prepare button is pressed; prepared files are
+# cached per dataset version and filter state and re-offered on later reruns
+export_view = EXPORT_SCOPES[export_scope] == 'view'
+export_key = (data_version, filter_state if export_view else None)
+with export_panel:
+    export_cols = st.columns(2)
+    for export_col, kind, label in ((export_cols[0], 'csv', "CSV"), (export_cols[1], 'excel', "Excel")):
+        with export_col:
+            if st.button(f"Prepare {label}", help=f"Build a {label} file of the selected scope"):
+                st.session_state[f'export_{kind}'] = export_key
+            if st.session_state.get(f'export_{kind}') == export_key:
+                if storage == 'sqlite':
+                    load_frame = lambda: export_sqlite_frame(rigs, filter_state if export_view else None)
+                else:
+                    export_rows = positions if export_view else None
+                    load_frame = lambda: export_frame(dataset, export_rows, feed)
+                data = build_export(kind, export_key, load_frame)
+                _, file_name, mime = rig_export.EXPORT_FORMATS[kind]
+                st.download_button(
+                    label=f"⬇️ {label}",
+                    data=data,
+                    file_name=file_name,
+                    mime=mime,
+                    help=f"Download data as {label} file"
+                )
+rerun_timer.lap('exports')
 
 # --- MAIN DASHBOARD LAYOUT ---
 st.markdown('<h1 class="main-header">⛴️ Offshore Rig Workflow Tracker</h1>', unsafe_allow_html=True)
 
+# All cards below come from one KPI pass over the requests; alert lists are
+# End_Date windows, read off the due-date index or the SQLite End_Date index
+if storage == 'sqlite':
+    kpis = rig_sqlite.compute_kpis(now, DB_FILE)
+    urgent_tasks = rig_sqlite.read_due(now, now + pd.Timedelta(days=URGENT_DAYS), path=DB_FILE)
+    weekly_tasks = rig_sqlite.read_due(now, now + pd.Timedelta(days=7), open_only=False, path=DB_FILE)
+else:
+    due_index = dataset.due_index
+    kpis = rig_metrics.compute_kpis(rigs, df, now=now, rollup=dataset.rollup, due_index=due_index)
+    urgent_tasks = rig_views.take_rows(df, due_index.due_within(now, URGENT_DAYS))
+    weekly_tasks = rig_views.take_rows(df, due_index.due_within(now, 7, open_only=False))
+
 # Quick stats row
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("Total Rigs", df['Rig'].nunique(), help="Total number of rigs in the system")
+    st.metric("Total Rigs", kpis.total_rigs, help="Total number of rigs in the system")
 with col2:
-    active_rigs = len(df[df['Rig_Status'] == 'Active'])
-    st.metric("Active Rigs", active_rigs, f"{active_rigs} operational", help="Currently active rigs")
+    st.metric("Active Rigs", kpis.active_rigs, f"{kpis.active_rigs} operational", help="Currently active rigs")
 with col3:
-    completion_rate = (len(df[df['Action_Complete'] == True]) / len(df)) * 100
-    st.metric("Completion Rate", f"{completion_rate:.1f}%", help="Overall action completion rate")
+    st.metric("Completion Rate", f"{kpis.completion_rate:.1f}%", help="Overall action completion rate")
 
 # --- PERFORMANCE METRICS ---
 st.markdown("### 📊 Performance Overview")
@@ -483,139 +914,266 @@ metric_cols = st.columns(4)
 
 with metric_cols[0]:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    monthly_requests = len(df[df['Start_Date'].dt.month == datetime.now().month])
-    st.metric("Monthly Requests", monthly_requests, help="Requests created this month")
+    st.metric("Monthly Requests", kpis.monthly_requests, help="Requests created this month")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with metric_cols[1]:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    monthly_complete = len(df[(df['Action_Complete'] == True) & (df['End_Date'].dt.month == datetime.now().month)])
-    st.metric("Monthly Completed", monthly_complete, help="Actions completed this month")
+    st.metric("Monthly Completed", kpis.monthly_completed, help="Actions completed this month")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with metric_cols[2]:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    upcoming_tasks = len(df[(df['End_Date'] > pd.Timestamp.now()) & 
-                          (df['End_Date'] <= pd.Timestamp.now() + pd.Timedelta(days=7)) & 
-                          (df['Action_Complete'] == False)])
-    st.metric("Upcoming Tasks", upcoming_tasks, help="Tasks due in the next 7 days")
+    st.metric("Upcoming Tasks", kpis.upcoming_tasks, help="Tasks due in the next 7 days")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with metric_cols[3]:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    overdue_tasks = len(df[(df['End_Date'] < pd.Timestamp.now()) & (df['Action_Complete'] == False)])
-    st.metric("Overdue Tasks", overdue_tasks, delta=f"{overdue_tasks} urgent", help="Tasks that are past their due date")
+    st.metric("Overdue Tasks", kpis.overdue_tasks, delta=f"{kpis.overdue_tasks} urgent", help="Tasks that are past their due date")
     st.markdown('</div>', unsafe_allow_html=True)
+rerun_timer.lap('kpis', kpis.total_requests)
+
+# --- KPI HISTORY ---
+if history is not None:
+    st.markdown("### 🕰️ KPI History")
+    if recorder.error is not None:
+        st.warning(f"History recording failed: {recorder.error}")
+    # KPIs at the end of every complete day, read from the pre-rolled table
+    # rather than rebuilt from the snapshots
+    daily = daily_history(history, now.normalize())
+    if daily.empty:
+        st.info("Trends and comparisons start once the first day of history is complete.")
+    else:
+        first_day, last_day = daily['Date'].min().date(), daily['Date'].max().date()
+        history_cols = st.columns([1, 2])
+        with history_cols[0]:
+            compare_day = st.date_input(
+                "Compare with",
+                value=max(first_day, last_day - timedelta(days=HISTORY_COMPARE_DAYS - 1)),
+                min_value=first_day,
+                max_value=last_day,
+                help="KPIs as they stood at the end of this day"
+            )
+            past = daily[daily['Date'] == pd.Timestamp(compare_day)].iloc[0]
+            for label, field, delta_color in HISTORY_CARDS:
+                change = getattr(kpis, field) - past[field]
+                if field == 'completion_rate':
+                    st.metric(label, f"{kpis.completion_rate:.1f}%", f"{change:+.1f} pts", delta_color=delta_color)
+                else:
+                    st.metric(label, getattr(kpis, field), f"{int(change):+d}", delta_color=delta_color)
+            st.caption(f"Change since the end of {compare_day}")
+        with history_cols[1]:
+            trend_label = st.selectbox("Trend", options=list(rig_history.TREND_MEASURES))
+            # Pre-rolled days plus today's live values
+            live = {'Date': now.normalize(), **{name: getattr(kpis, name) for name in rig_history.KPI_FIELDS}}
+            trend = pd.concat([daily, pd.DataFrame([live])], ignore_index=True)
+            st.plotly_chart(rig_history.build_trend_figure(trend, trend_label), use_container_width=True)
+    rerun_timer.lap('history', len(daily))
 
 # --- NOTIFICATIONS & ALERTS ---
 st.markdown("### 🔔 Notifications & Alerts")
 
 # Urgent tasks (due in 3 days or less)
-urgent_tasks = df[(df['End_Date'] >= pd.Timestamp.now()) & 
-                 (df['End_Date'] <= pd.Timestamp.now() + pd.Timedelta(days=3)) & 
-                 (df['Action_Complete'] == False)]
-
-if not urgent_tasks.empty:
-    for _, task in urgent_tasks.iterrows():
-        days_left = (task['End_Date'] - pd.Timestamp.now()).days
-        st.markdown(f'''
-        <div class="urgent-alert">
-            <b>🚨 URGENT ACTION REQUIRED:</b> {task['Rig']} - {task['Action_Requested']}<br>
-            <b>Due:</b> {days_left} days ({task['End_Date'].strftime('%Y-%m-%d')}) | 
-            <b>Requested by:</b> {task['Requestor']} | 
-            <b>Priority:</b> {task['Priority']}
-        </div>
-        ''', unsafe_allow_html=True)
-else:
+if urgent_tasks.empty:
     st.markdown('<div class="info-alert">✅ No urgent actions required in the next 3 days</div>', unsafe_allow_html=True)
+elif len(urgent_tasks) <= ALERT_PAGE_SIZE:
+    render_urgent_alerts(urgent_tasks, now)
+else:
+    # Large alert sets are summarised per rig or paged instead of rendered in full
+    st.markdown(f'''
+    <div class="urgent-alert">
+        <b>🚨 {len(urgent_tasks)} URGENT ACTIONS REQUIRED</b> across
+        {urgent_tasks['Rig'].nunique()} rigs in the next {URGENT_DAYS} days
+    </div>
+    ''', unsafe_allow_html=True)
+    alert_view = st.radio("Alert view", ["Grouped by rig", "List"], horizontal=True)
+    if alert_view == "Grouped by rig":
+        st.dataframe(rig_views.group_alerts_by_rig(urgent_tasks), use_container_width=True)
+    else:
+        num_pages = -(-len(urgent_tasks) // ALERT_PAGE_SIZE)
+        alert_page = st.number_input("Alert page", min_value=1, max_value=num_pages, value=1, step=1)
+        first = (int(alert_page) - 1) * ALERT_PAGE_SIZE
+        page_tasks = urgent_tasks.iloc[first:first + ALERT_PAGE_SIZE]
+        render_urgent_alerts(page_tasks, now)
+        st.caption(f"Showing {first + 1}-{first + len(page_tasks)} of {len(urgent_tasks)} urgent actions")
+rerun_timer.lap('alerts', len(urgent_tasks))
 
 # Weekly overview
 st.markdown("#### 📋 This Week's Overview")
-weekly_tasks = df[(df['End_Date'] >= pd.Timestamp.now()) & 
-                 (df['End_Date'] <= pd.Timestamp.now() + pd.Timedelta(days=7))]
 
 if not weekly_tasks.empty:
-    weekly_summary = weekly_tasks.groupby('Rig').agg({
-        'Action_Requested': 'count',
-        'Action_Complete': 'sum'
-    }).rename(columns={'Action_Requested': 'Total', 'Action_Complete': 'Completed'})
-    
-    weekly_summary['Completion'] = (weekly_summary['Completed'] / weekly_summary['Total'] * 100).round(1)
-    st.dataframe(weekly_summary, use_container_width=True)
+    st.dataframe(rig_views.weekly_summary(weekly_tasks), use_container_width=True)
 else:
     st.info("No tasks scheduled for the upcoming week.")
+rerun_timer.lap('weekly', len(weekly_tasks))
 
 # --- GANTT CHART VISUALIZATION ---
 st.markdown("### 📅 Rig & Request Timeline")
+st.caption(f"{len(rigs_in_window)} rigs operating in the selected window")
 
-gantt_data = []
-for _, row in filtered_df.iterrows():
-    # Main rig operational period
-    gantt_data.append(dict(
-        Task=row['Rig'], 
-        Start=row['Rig_Start'], 
-        Finish=row['Rig_End'], 
-        Resource="Rig Operation", 
-        Details=f"Status: {row['Rig_Status']}",
-        ID=row['Rig'],
-        Priority=row['Priority']
-    ))
-    # Individual requests
-    gantt_data.append(dict(
-        Task=row['Rig'], 
-        Start=row['Start_Date'], 
-        Finish=row['End_Date'], 
-        Resource=row['Action_Requested'], 
-        Details=f"{row['Requestor']} | {row['Action_Requested']}",
-        ID=row['Request_ID'],
-        Priority=row['Priority']
-    ))
+if storage == 'sqlite':
+    timeline_inputs = db_version
+    load_pyramid = lambda: read_sqlite_pyramid(DB_FILE, db_version)
+else:
+    # Only the columns the timeline reads: completing a request, say, keeps
+    # the cached figure
+    timeline_inputs = dataset.stamp(rig_timeline.REQUEST_COLUMNS)
+    load_pyramid = lambda: dataset.pyramid
+selection = dict(rigs=view_rigs, priorities=priority_filter)
+timeline_span = span_days
+if date_mode == 'active' or range_start is not None:
+    # The pyramid buckets requests by start day only, so it cannot answer the
+    # contained, overlapping or active filters: bucket the filtered rows
+    # instead, keeping the level, caption and bars on the table's rows. Built
+    # once per filter state, so switching levels reuses it
+    load_pyramid = lambda: filter_cache().get_or_compute(
+        ('timeline pyramid', timeline_inputs, filter_state),
+        lambda: rig_timeline.build_bucket_pyramid(filtered_df))
+    selection = {}
+    if date_mode == 'active':
+        timeline_span = None
+num_bars, timeline_figure, timeline_caption = filter_cache().get_or_compute(
+    ('timeline', timeline_inputs, filter_state, timeline_detail),
+    lambda: timeline_view(rigs, filtered_df, TIMELINE_DETAIL_LEVELS[timeline_detail], load_pyramid,
+                          timeline_span, selection)
+)
+if timeline_caption:
+    st.caption(timeline_caption)
 
-gantt_df = pd.DataFrame(gantt_data)
-
-if not gantt_df.empty:
-    fig = px.timeline(
-        gantt_df,
-        x_start="Start",
-        x_end="Finish",
-        y="Task",
-        color="Resource",
-        hover_data={"Details": True, "Resource": True, "Start": False, "Finish": False, "ID": True, "Priority": True},
-        title="Rig and Request Timeline",
-        height=600
-    )
-    fig.update_yaxes(autorange="reversed")
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(size=12),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        hovermode='closest'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+if timeline_figure is not None:
+    st.plotly_chart(timeline_figure, use_container_width=True)
 else:
     st.info("No data to display for the selected filters.")
+rerun_timer.lap('timeline', num_bars)
+
+# --- CAPACITY HEATMAP ---
+st.markdown("### 👷 Rig Capacity")
+capacity_measure = st.radio(
+    "Load measure",
+    options=list(rig_capacity.MEASURES),
+    horizontal=True,
+    help="Concurrent Team_Size or Cost_Estimate of all requests on a rig, whatever their priority"
+)
+if storage == 'sqlite':
+    capacity_inputs = db_version
+    capacity_requests, capacity_profile = read_sqlite_capacity(DB_FILE, db_version)
+    # Conflict sets touching the requests in view
+    conflict_rows = lambda: np.flatnonzero(capacity_requests['Request_ID'].isin(filtered_df['Request_ID']))
+else:
+    # The conflict sets are read at the filtered positions, so the filter
+    # columns belong in the key as well
+    capacity_inputs = dataset.stamp(rig_capacity.CAPACITY_COLUMNS + rig_views.FILTER_COLUMNS)
+    capacity_requests, capacity_profile = df, dataset.capacity
+    conflict_rows = lambda: positions
+figure, peaks, (num_sets, num_conflicting), conflicts = filter_cache().get_or_compute(
+    ('capacity', capacity_inputs, filter_state, capacity_measure),
+    lambda: capacity_view(capacity_profile, capacity_requests, capacity_measure, view_rigs,
+                          range_start, range_end, span_days, conflict_rows())
+)
+if figure is not None:
+    st.plotly_chart(figure, use_container_width=True)
+    with st.expander(f"📈 Peak {capacity_measure.lower()} per rig"):
+        st.dataframe(peaks, use_container_width=True)
+else:
+    st.info("No rig load in the selected window.")
+
+if num_sets:
+    st.warning(f"⚠️ {num_sets} conflict sets: {num_conflicting} requests overlap others on the same rig")
+    with st.expander(f"🔀 Largest conflict sets (top {CONFLICT_ROWS})"):
+        st.dataframe(conflicts, use_container_width=True)
+rerun_timer.lap('capacity', len(peaks))
 
 # --- DETAILED REQUEST VIEW ---
 st.markdown("### 📋 Detailed Request Overview")
 
-detailed_view = filtered_df[[
-    "Rig", "Request_ID", "Action_Requested", "Requestor", "Start_Date", "End_Date",
-    "Duration_Days", "Priority", "Action_Doable", "Action_Complete", "Response_Provided", "Rig_Status"
-]].copy()
-
-# Format for display
-detailed_view['Start_Date'] = detailed_view['Start_Date'].dt.strftime('%Y-%m-%d')
-detailed_view['End_Date'] = detailed_view['End_Date'].dt.strftime('%Y-%m-%d')
-detailed_view['Action_Doable'] = detailed_view['Action_Doable'].map({True: '✅', False: '❌'})
-detailed_view['Action_Complete'] = detailed_view['Action_Complete'].map({True: '✅', False: '⏳'})
-detailed_view['Response_Provided'] = detailed_view['Response_Provided'].map({True: '✅', False: '📝'})
-
-st.dataframe(
-    detailed_view,
-    use_container_width=True,
-    height=400
+# Prefix search over Request_ID, Requestor, Action_Requested and Rig; every
+# word must match the start of a word in one of them. The index is built once
+# per data version, so a lookup is two binary searches plus the matching rows
+search_query = st.text_input(
+    "🔎 Search requests",
+    placeholder="e.g. REQ-00042, safety insp, deepwater",
+    help="Narrow the table below to requests whose ID, requestor, action or rig starts with each word"
 )
+search_key = tuple(sorted(set(search_query.lower().split())))
+table_df = filtered_df
+# Sorted frame positions of the table's rows, None for all of them
+table_rows = None if storage == 'sqlite' else positions
+if search_key:
+    search_index = sqlite_search_index(DB_FILE, db_version) if storage == 'sqlite' else dataset.search
+    matches = search_index.search(search_query)
+    if storage == 'sqlite':
+        found_ids = search_index.requests['Request_ID'].iloc[matches]
+        table_df = filtered_df[filtered_df['Request_ID'].isin(found_ids)]
+    else:
+        # Matches are positions in the shared frame, like the filter's
+        table_rows = matches if positions is None else positions[np.isin(positions, matches)]
+        table_df = rig_views.take_rows(df, table_rows)
+    st.caption(f"{len(table_df)} of {len(filtered_df)} requests in view match \"{search_query.strip()}\" "
+               f"({len(matches)} in all data)")
+
+# Sorting and paging run server-side; only the visible page is formatted
+# and sent to the browser, so the cost follows the page size
+table_cols = st.columns([2, 1, 1, 2])
+with table_cols[0]:
+    sort_column = st.selectbox("Sort by", options=rig_views.DETAIL_COLUMNS,
+                               index=rig_views.DETAIL_COLUMNS.index("End_Date"))
+with table_cols[1]:
+    sort_descending = st.checkbox("Descending", value=False)
+with table_cols[2]:
+    page_size = st.selectbox("Rows per page", options=DETAIL_PAGE_SIZES, index=1)
+with table_cols[3]:
+    jump_id = st.text_input("Jump to Request_ID", help="Open the page containing this request").strip()
+
+# Sort orders are cached next to the filter results they belong to
+order = filter_cache().get_or_compute(
+    ('sort', data_version, filter_state, search_key, sort_column, sort_descending),
+    lambda: rig_cache.read_only(rig_views.sort_order(table_df, sort_column, sort_descending))
+)
+num_pages = rig_views.page_count(len(table_df), page_size)
+
+jump_place = None
+if jump_id:
+    # Request_ID -> place in the sorted table without scanning it: a dict
+    # lookup, then the inverse of the sort order, built on the first jump
+    sort_key = (data_version, filter_state, search_key, sort_column, sort_descending)
+    ranks = filter_cache().get_or_compute(
+        ('ranks',) + sort_key, lambda: rig_cache.read_only(rig_views.view_ranks(order)))
+    if storage == 'sqlite':
+        # The table is its own frame; its lookup is kept with the view
+        table_ids = filter_cache().get_or_compute(
+            ('ids', data_version, filter_state, search_key),
+            lambda: dict(zip(table_df['Request_ID'], range(len(table_df)))))
+        jump_place = rig_views.find_request(table_ids.get(jump_id), None, ranks)
+    else:
+        jump_place = rig_views.find_request(dataset.id_positions().get(jump_id), table_rows, ranks)
+    if jump_place is None:
+        st.warning(f"{jump_id} is not in the current filtered view")
+    elif jump_id != st.session_state.get('detail_jump'):
+        # Applied once per lookup, so the pager stays usable afterwards
+        st.session_state.detail_page = jump_place // page_size + 1
+st.session_state.detail_jump = jump_id
+if st.session_state.get('detail_page', 1) > num_pages:
+    st.session_state.detail_page = num_pages
+
+if table_df.empty:
+    st.info("No requests match the search." if search_key else "No requests match the selected filters.")
+else:
+    page = st.number_input("Page", min_value=1, max_value=num_pages, step=1, key='detail_page')
+    first = (int(page) - 1) * page_size
+    page_rows = rig_views.take_rows(table_df, order[first:first + page_size])
+    detailed_view = rig_views.detailed_view(page_rows, rigs)
+
+    st.dataframe(
+        detailed_view,
+        use_container_width=True,
+        height=400
+    )
+    caption = f"Rows {first + 1}-{first + len(page_rows)} of {len(table_df)}, sorted by {sort_column}"
+    if jump_place is not None:
+        caption += f" | {jump_id} is row {jump_place + 1}"
+    st.caption(caption)
+# Rows formatted for the visible page
+rerun_timer.lap('detailed_view', min(len(table_df), page_size))
 
 # --- FOOTER WITH ENHANCED INFO ---
 st.markdown("---")
@@ -657,6 +1215,7 @@ with st.expander("ℹ️ How to Use This Dashboard"):
     
     **Data Management:**
     - Generate sample data for demonstration
+    - Bulk import Excel or CSV drops; rejected rows can be downloaded with the reason
     - Export current view to CSV or Excel
     - All data is automatically persisted
     
@@ -666,6 +1225,36 @@ with st.expander("ℹ️ How to Use This Dashboard"):
     
     For support or questions, please contact your system administrator.
     """)
+rerun_timer.lap('footer')
+
+# --- PERFORMANCE PANEL ---
+sink = metrics_sink(config.get('metrics_file', METRICS_FILE))
+sink.record(rerun_timer)
+if show_performance:
+    st.markdown("### ⏱️ Performance")
+    perf_cols = st.columns(2)
+    with perf_cols[0]:
+        st.caption(f"This rerun: {rerun_timer.total() * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame(
+            [(section, seconds * 1000, rows) for section, seconds, rows in rerun_timer.laps],
+            columns=['Section', 'ms', 'Rows']
+        ).round(1), use_container_width=True)
+    with perf_cols[1]:
+        st.caption(f"Server process: {sink.reruns} reruns")
+        st.dataframe(pd.DataFrame(
+            [(section, runs, mean * 1000, last * 1000, rows) for section, runs, mean, last, rows in sink.summary()],
+            columns=['Section', 'Runs', 'Mean ms', 'Last ms', 'Rows']
+        ).round(1), use_container_width=True)
+
+# --- LIVE REFRESH ---
+# The scheduler reruns this session once the watched files move past the
+# version it rendered; the next run subscribes again
+script_context = get_script_run_ctx()
+if script_context is not None:
+    if live_refresh:
+        scheduler.subscribe(script_context.session_id, rendered_version, refresh_seconds)
+    else:
+        scheduler.unsubscribe(script_context.session_id)
 
 # Add theme application closing tag
 st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
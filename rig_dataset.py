@@ -0,0 +1,152 @@
+import threading
+from functools import cached_property
+
+import numpy as np
+
+import rig_capacity
+import rig_index
+import rig_ingest
+import rig_metrics
+import rig_search
+import rig_store
+import rig_timeline
+
+# --- SHARED DATASET ---
+# Lazily built views and the request columns they are computed from
+CARRIED_VIEWS = {
+    'pyramid': ['Rig', 'Start_Date', 'Priority'],
+    'capacity': rig_capacity.CAPACITY_COLUMNS,
+    'search': rig_search.INDEX_COLUMNS + ['rigs']
+}
+
+class Dataset:
+    # One loaded version of the tables plus everything derived from it. A
+    # single instance is shared by every session in the process, so nothing
+    # here is modified after construction: sessions filter into arrays of row
+    # positions, and a reload builds a new Dataset instead of patching this one.
+    def __init__(self, version, rigs, requests, feed=None, indexes=None, id_positions=None, stamps=None):
+        self.version = version
+        self.rigs = rigs
+        self.requests = requests
+        # Version in which each request column (and 'rigs') last changed, so
+        # a view can be kept across versions that did not touch its inputs
+        if stamps is None:
+            stamps = dict.fromkeys([*requests.columns, 'rigs'], version)
+        self.stamps = stamps
+        # Position reached in the CSV feed applied on top of the tables, if any
+        self.feed = feed
+        if indexes is None:
+            indexes = (
+                rig_index.WindowIndex.from_frame(requests, 'Start_Date', 'End_Date'),
+                rig_index.DueDateIndex.from_requests(requests),
+                rig_metrics.KpiRollup.from_requests(requests)
+            )
+        self.windows, self.due_index, self.rollup = indexes
+        self._id_positions = id_positions
+
+    @classmethod
+    def load(cls, version, rigs_path, requests_path, columns=None):
+        return cls(version, rig_store.read_table(rigs_path), rig_store.read_table(requests_path, columns))
+
+    @cached_property
+    def pyramid(self):
+        # Only wide timeline views need it, so it is built on first use
+        return rig_timeline.build_bucket_pyramid(self.requests)
+
+    @cached_property
+    def capacity(self):
+        # Sweep-line load curves and conflict sets, built on first use
+        return rig_capacity.CapacityProfile(self.requests)
+
+    @cached_property
+    def search(self):
+        # Prefix search over requests and the sidebar's filter choices
+        return rig_search.SearchIndex(self.requests, self.rigs)
+
+    def stamp(self, columns, rigs=True):
+        # Columns missing from older tables never change
+        return tuple(self.stamps.get(col) for col in columns) + ((self.stamps['rigs'],) if rigs else ())
+
+    def id_positions(self):
+        # Request_ID -> row position. Incremental versions only overwrite or
+        # append rows, so positions never move and one dict serves the whole
+        # chain; only the newest version (under the SharedDataset lock) adds to it
+        if self._id_positions is None:
+            self._id_positions = dict(zip(self.requests['Request_ID'], range(len(self.requests))))
+        return self._id_positions
+
+    def apply_rows(self, version, rows, feed=None):
+        # New version with flat rows upserted by Request_ID. Only the rows that
+        # are new or actually changed are re-aggregated, and the indexes take
+        # them in by binary search, so the cost follows the delta rather than
+        # the table (bar one copy of the columns)
+        rigs = rig_ingest.upsert_rigs(self.rigs, rows)
+        stamps = dict(self.stamps)
+        if rigs is not self.rigs:
+            stamps['rigs'] = version
+        if not len(rows):
+            indexes, requests = (self.windows, self.due_index, self.rollup), self.requests
+            return self.successor(version, rigs, requests, feed, indexes, self._id_positions, stamps)
+
+        id_positions = self.id_positions()
+        positions, changed, added = rig_ingest.request_changes(self.requests, id_positions, rows)
+        if not len(positions) and not len(added):
+            indexes, requests = (self.windows, self.due_index, self.rollup), self.requests
+            return self.successor(version, rigs, requests, feed, indexes, id_positions, stamps)
+        # New rows touch every column; changed rows only the ones that differ
+        touched_columns = self.requests.columns if len(added) else rig_ingest.changed_columns(
+            self.requests, positions, changed)
+        stamps.update(dict.fromkeys(touched_columns, version))
+
+        requests = rig_ingest.upsert_frame(self.requests, positions, changed, added)
+        first_added = len(self.requests)
+        id_positions.update(zip(requests['Request_ID'].iloc[first_added:], range(first_added, len(requests))))
+
+        touched = np.concatenate([positions, np.arange(first_added, len(requests))])
+        before, after = rig_store.take_rows(self.requests, positions), requests.iloc[touched]
+        starts, ends = after['Start_Date'].to_numpy(), after['End_Date'].to_numpy()
+        indexes = (
+            self.windows.replace_rows(touched, starts, ends),
+            self.due_index.replace_rows(touched, ends, ~after['Action_Complete'].to_numpy(dtype=bool)),
+            # Subtract the old versions of changed rows, add the new ones
+            rig_metrics.KpiRollup(self.rollup.table).apply(removed=before, added=after)
+        )
+        return self.successor(version, rigs, requests, feed, indexes, id_positions, stamps)
+
+    def successor(self, version, rigs, requests, feed, indexes, id_positions, stamps):
+        dataset = Dataset(version, rigs, requests, feed, indexes, id_positions, stamps)
+        # Built views carry over while the columns they read are unchanged
+        for view, columns in CARRIED_VIEWS.items():
+            if view in self.__dict__ and all(stamps.get(col) == self.stamps.get(col) for col in columns):
+                setattr(dataset, view, getattr(self, view))
+        return dataset
+
+class SharedDataset:
+    # Holds the current Dataset for the process. A new version is built
+    # once, under a lock, then published with a single reference assignment:
+    # readers see the old or the new dataset, never a mix, and sessions that
+    # still hold the old one keep a consistent view until they let it go.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+
+    def get(self, version, load, update=None):
+        # update(current, version) may derive the new version from the current
+        # one and returns None when only a full load will do
+        current = self._current
+        if current is not None and current.version == version:
+            return current
+        with self._lock:
+            current = self._current
+            if current is None or current.version != version:
+                updated = None
+                if current is not None and update is not None:
+                    updated = update(current, version)
+                current = load(version) if updated is None else updated
+                self._current = current
+            return current
+
+    def invalidate(self):
+        # Forces the next get() to reload, e.g. after a rewrite that kept the
+        # file signature
+        self._current = None
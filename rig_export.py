@@ -0,0 +1,63 @@
+from io import BytesIO
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+# Rows converted to Python values at a time; the write-only workbook spills
+# finished rows to a temporary file, so memory stays flat for any frame size
+EXCEL_CHUNK_ROWS = 10_000
+
+# --- EXCEL EXPORT ---
+def excel_rows(chunk):
+    # openpyxl wants plain Python values; NaT/NaN become empty cells
+    columns = [chunk[col].astype(object).where(chunk[col].notna(), None) for col in chunk.columns]
+    return zip(*columns)
+
+def summary_rows(df):
+    complete = df['Action_Complete'].to_numpy(dtype=bool)
+    return [
+        ('Total Rigs', int(df['Rig'].nunique())),
+        ('Active Rigs', int(df.loc[df['Rig_Status'] == 'Active', 'Rig'].nunique())),
+        ('Completed Requests', int(complete.sum())),
+        ('Pending Actions', int((~complete).sum()))
+    ]
+
+def header_row(sheet, names):
+    cells = []
+    for name in names:
+        cell = WriteOnlyCell(sheet, value=name)
+        cell.font = Font(bold=True)
+        cells.append(cell)
+    return cells
+
+def write_excel(df, target, chunk_size=EXCEL_CHUNK_ROWS):
+    workbook = Workbook(write_only=True)
+
+    sheet = workbook.create_sheet('RigOperations')
+    sheet.append(header_row(sheet, list(df.columns)))
+    for start in range(0, len(df), chunk_size):
+        for row in excel_rows(df.iloc[start:start + chunk_size]):
+            sheet.append(row)
+
+    # Add summary sheet
+    summary = workbook.create_sheet('Summary')
+    summary.append(header_row(summary, ['Metric', 'Value']))
+    for row in summary_rows(df):
+        summary.append(row)
+
+    workbook.save(target)
+
+def to_excel(df):
+    output = BytesIO()
+    write_excel(df, output)
+    return output.getvalue()
+
+# --- CSV EXPORT ---
+def to_csv(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+EXPORT_FORMATS = {
+    'csv': (to_csv, "rig_operations.csv", "text/csv"),
+    'excel': (to_excel, "rig_operations.xlsx", "application/vnd.ms-excel")
+}
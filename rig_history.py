@@ -0,0 +1,324 @@
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import rig_index
+import rig_ingest
+import rig_metrics
+import rig_store
+
+# --- APPEND-ONLY HISTORY ---
+# Every dataset version seen is appended as a numbered snapshot directory,
+# stored as a delta against the one before it: the requests that are new or
+# changed, the Request_IDs that disappeared, and the rigs table only when it
+# changed. Snapshots are never rewritten, so any past point can be rebuilt.
+HISTORY_DIR = Path("history")
+# Every this many snapshots one is stored in full, so rebuilding any point
+# replays at most this many deltas
+FULL_EVERY = 20
+# One row of KPIs per complete day, rolled forward as days pass
+DAILY_FILE = "daily_kpis.parquet"
+KPI_FIELDS = [field.name for field in fields(rig_metrics.KpiSummary)]
+# Trend chart choices
+TREND_MEASURES = {
+    "Overdue Tasks": 'overdue_tasks',
+    "Upcoming Tasks": 'upcoming_tasks',
+    "Completion Rate": 'completion_rate',
+    "Total Requests": 'total_requests',
+    "Active Rigs": 'active_rigs'
+}
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    seq: int
+    taken_at: pd.Timestamp
+    # Name of the dataset version recorded, so a version is stored once
+    version: str
+    full: bool
+    rows: int
+    removed: int
+    rigs: bool
+
+@dataclass(frozen=True)
+class HistoryState:
+    seq: int
+    rigs: pd.DataFrame
+    requests: pd.DataFrame
+    # Per-row hashes of requests, computed when needed for a diff
+    hashes: np.ndarray = None
+
+def row_hashes(requests):
+    # Hashed by value: categories, Arrow strings and object strings of the
+    # same text hash alike, so a rebuilt state diffs cleanly against a live one
+    return pd.util.hash_pandas_object(requests, index=False).to_numpy()
+
+def snapshot_dir_name(seq):
+    return f"{seq:08d}"
+
+def read_info(path):
+    with open(path / "meta.json") as f:
+        meta = json.load(f)
+    return SnapshotInfo(int(path.name), pd.Timestamp(meta['taken_at']), meta['version'], meta['full'],
+                        meta['rows'], meta['removed'], meta['rigs'])
+
+def write_frame(frame, path):
+    rig_store.apply_schema(frame).to_parquet(path, index=False)
+
+def day_ends(days):
+    # Last instant of each day, so the day's own month and due dates apply
+    return days + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+
+class HistoryStore:
+    # One per process and directory. Several processes may append to the same
+    # directory: a snapshot is written under a temporary name and renamed
+    # into its sequence number, and a process that loses the race skips it.
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        # Snapshots are immutable, so their metadata is read once
+        self._infos = {}
+        # Newest state this process has rebuilt or recorded, the base of the next diff
+        self._latest = None
+
+    def snapshots(self):
+        if not self.directory.exists():
+            return []
+        for path in self.directory.iterdir():
+            if path.name.isdigit() and int(path.name) not in self._infos:
+                self._infos[int(path.name)] = read_info(path)
+        return [self._infos[seq] for seq in sorted(self._infos)]
+
+    # --- REPLAY ---
+    def apply(self, state, info):
+        # State after snapshot info, given the state right before it
+        path = self.directory / snapshot_dir_name(info.seq)
+        rigs = rig_store.read_table(path / "rigs.parquet") if info.rigs else state.rigs
+        rows = rig_store.read_table(path / "requests.parquet")
+        if info.full:
+            return HistoryState(info.seq, rigs, rows)
+        requests = state.requests
+        if len(rows):
+            at = pd.Index(requests['Request_ID']).get_indexer(rows['Request_ID'])
+            # Changed rows are overwritten in place and new ones appended
+            requests = rig_ingest.upsert_frame(requests, at[at >= 0], rows[at >= 0], rows[at < 0])
+        if info.removed:
+            removed = pd.read_parquet(path / "removed.parquet")['Request_ID']
+            requests = requests[~requests['Request_ID'].isin(removed)].reset_index(drop=True)
+        return HistoryState(info.seq, rigs, requests)
+
+    def replay(self, infos, seq, state=None):
+        # State at snapshot seq, continuing from state when it is not past it
+        # and no full snapshot lies in between; otherwise from the last full one
+        full = max(info.seq for info in infos if info.full and info.seq <= seq)
+        if state is None or state.seq < full or state.seq > seq:
+            state = None
+        for info in infos:
+            if (full if state is None else state.seq + 1) <= info.seq <= seq:
+                state = self.apply(state, info)
+        return state
+
+    def state_at(self, when):
+        # (rigs, requests) as last recorded at or before when, None before the history starts
+        with self._lock:
+            infos = self.snapshots()
+            taken = [info for info in infos if info.taken_at <= pd.Timestamp(when)]
+            if not taken:
+                return None
+            state = self.replay(infos, taken[-1].seq, self._latest)
+            return state.rigs, state.requests
+
+    def kpis_at(self, when):
+        # Time travel for the KPI engine: the KPIs as they stood at when,
+        # e.g. overdue tasks last Monday morning
+        state = self.state_at(when)
+        if state is None:
+            return None
+        return rig_metrics.compute_kpis(*state, now=when)
+
+    # --- RECORDING ---
+    def record(self, rigs, requests, version=None, taken_at=None):
+        # Appends the tables as the next snapshot and returns its info; a
+        # version already recorded last, or a lost race, appends nothing
+        taken_at = pd.Timestamp.now() if taken_at is None else pd.Timestamp(taken_at)
+        with self._lock:
+            infos = self.snapshots()
+            latest = infos[-1] if infos else None
+            if latest is not None and version is not None and latest.version == version:
+                return latest
+            if requests['Request_ID'].duplicated().any():
+                requests = requests.drop_duplicates('Request_ID', keep='last')
+            requests = requests.reset_index(drop=True)
+            hashes = row_hashes(requests)
+            seq = 0 if latest is None else latest.seq + 1
+            previous = None if latest is None else self.replay(infos, latest.seq, self._latest)
+            full = (previous is None or seq % FULL_EVERY == 0
+                    or list(previous.requests.columns) != list(requests.columns))
+
+            removed = pd.Series([], dtype=object)
+            if full:
+                rows = requests
+            else:
+                if previous.hashes is None:
+                    previous = HistoryState(previous.seq, previous.rigs, previous.requests,
+                                            row_hashes(previous.requests))
+                at = pd.Index(previous.requests['Request_ID']).get_indexer(requests['Request_ID'])
+                known = at >= 0
+                changed = ~known
+                changed[known] = previous.hashes[at[known]] != hashes[known]
+                rows = requests[changed]
+                kept = pd.Index(requests['Request_ID']).get_indexer(previous.requests['Request_ID']) >= 0
+                removed = previous.requests['Request_ID'][~kept]
+            with_rigs = full or not rig_store.apply_schema(rigs).reset_index(drop=True).equals(previous.rigs)
+
+            self.directory.mkdir(exist_ok=True)
+            path = self.directory / snapshot_dir_name(seq)
+            tmp_path = self.directory / f".{path.name}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            tmp_path.mkdir()
+            write_frame(rows, tmp_path / "requests.parquet")
+            if with_rigs:
+                write_frame(rigs, tmp_path / "rigs.parquet")
+            if len(removed):
+                pd.DataFrame({'Request_ID': removed.astype(str)}).to_parquet(
+                    tmp_path / "removed.parquet", index=False)
+            meta = {'taken_at': taken_at.isoformat(), 'version': version, 'full': bool(full),
+                    'rows': len(rows), 'removed': len(removed), 'rigs': bool(with_rigs)}
+            with open(tmp_path / "meta.json", 'w') as f:
+                json.dump(meta, f)
+            try:
+                os.rename(tmp_path, path)
+            except OSError:
+                # Another process appended this sequence number first
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                return None
+            info = read_info(path)
+            self._infos[seq] = info
+            # The frames recorded are the state after this snapshot
+            self._latest = HistoryState(seq, rig_store.apply_schema(rigs).reset_index(drop=True),
+                                        requests, hashes)
+            return info
+
+    # --- DAILY KPI ROLLUP ---
+    def daily_kpis(self, today=None):
+        # KPIs at the end of every complete day since the first snapshot, one
+        # row per day. Days already rolled are read back; only new ones are
+        # computed, walking the snapshots forward once, and each recorded
+        # state is indexed once for all the days it covers
+        today = pd.Timestamp.now().normalize() if today is None else pd.Timestamp(today).normalize()
+        path = self.directory / DAILY_FILE
+        with self._lock:
+            infos = self.snapshots()
+            daily = pd.read_parquet(path) if path.exists() else pd.DataFrame(columns=['Date'] + KPI_FIELDS)
+            if not infos:
+                return daily
+            first = infos[0].taken_at.normalize() if daily.empty else daily['Date'].max() + pd.Timedelta(days=1)
+            days = pd.date_range(first, today - pd.Timedelta(days=1), freq='D')
+            if not len(days):
+                return daily
+
+            ends = day_ends(days)
+            taken = pd.DatetimeIndex([info.taken_at for info in infos])
+            # Snapshot in effect at each day's end
+            effective = taken.searchsorted(ends, side='right') - 1
+            rows, state = [], None
+            for position in np.unique(effective[effective >= 0]):
+                state = self.replay(infos, infos[position].seq, state)
+                due_index = rig_index.DueDateIndex.from_requests(state.requests)
+                rollup = rig_metrics.KpiRollup.from_requests(state.requests)
+                for day, end in zip(days[effective == position], ends[effective == position]):
+                    kpis = rig_metrics.compute_kpis(state.rigs, state.requests, now=end,
+                                                    rollup=rollup, due_index=due_index)
+                    rows.append({'Date': day, **{name: getattr(kpis, name) for name in KPI_FIELDS}})
+            if rows:
+                rows = pd.DataFrame(rows)
+                daily = rows if daily.empty else pd.concat([daily, rows], ignore_index=True)
+                tmp_path = path.with_name(path.name + ".tmp")
+                daily.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            return daily
+
+# --- TREND FIGURE ---
+def build_trend_figure(daily, label):
+    fig = px.line(
+        daily,
+        x='Date',
+        y=TREND_MEASURES[label],
+        markers=len(daily) <= 60,
+        labels={'Date': "Day", TREND_MEASURES[label]: label},
+        title=f"{label} at the end of each day",
+        height=350
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12)
+    )
+    return fig
+
+# --- BACKGROUND RECORDING ---
+class HistoryRecorder:
+    # Records in a background thread, so a load never waits on the diff. A
+    # burst of versions (a busy CSV feed) records only the newest one, and a
+    # version seen again is not submitted twice.
+    def __init__(self, store):
+        self.store = store
+        self.error = None
+        self._submitted = None
+        self._pending = None
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name="rig-history-recorder", daemon=True).start()
+
+    def submit(self, version, load):
+        # load() returns (rigs, requests) and runs in the background thread
+        if version == self._submitted:
+            return
+        self._submitted = version
+        self._pending = (version, load, pd.Timestamp.now())
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            version, load, taken_at = pending
+            try:
+                self.store.record(*load(), version=version, taken_at=taken_at)
+                self.error = None
+            except Exception as e:
+                # Shown by the dashboard; whatever failed, the thread lives on
+                # and the next version is tried again
+                self.error = e
+
+if __name__ == "__main__":
+    # python rig_history.py record | kpis <when> | daily
+    import sys
+    store = HistoryStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'record' and len(sys.argv) == 2:
+        # The columns the dashboard records, so its deltas and these compare alike
+        info = store.record(rig_store.read_table(rig_store.RIGS_FILE),
+                            rig_store.read_table(rig_store.REQUESTS_FILE, rig_store.DASHBOARD_COLUMNS))
+        if info is None:
+            sys.exit("Another process recorded a snapshot at the same time; try again")
+        print(f"Recorded snapshot {info.seq} ({'full' if info.full else 'delta'}): "
+              f"{info.rows} rows, {info.removed} removed")
+    elif command == 'kpis' and len(sys.argv) == 3:
+        kpis = store.kpis_at(pd.Timestamp(sys.argv[2]))
+        if kpis is None:
+            sys.exit(f"No history before {sys.argv[2]}")
+        for name in KPI_FIELDS:
+            print(f"{name}: {getattr(kpis, name)}")
+    elif command == 'daily' and len(sys.argv) == 2:
+        print(store.daily_kpis().to_string(index=False))
+    else:
+        sys.exit("Usage: python rig_history.py record | kpis <date or timestamp> | daily")
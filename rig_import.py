@@ -0,0 +1,308 @@
+import argparse
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from openpyxl import load_workbook
+
+import rig_ingest
+import rig_sqlite
+import rig_store
+
+# --- STREAMING BULK IMPORT ---
+# Contractor drops (multi-sheet .xlsx or large CSV, flat one-row-per-request
+# layout) are read a chunk at a time, validated, and upserted by Request_ID.
+# Only one chunk of raw rows is held at a time; rows that fail validation are
+# appended to a reject file with the reason, and the rest still go in.
+IMPORT_CHUNK_ROWS = 50_000
+REJECT_SUFFIX = ".rejects.csv"
+# Reject files of uploads, which have no directory of their own
+REJECT_DIR = Path("rejects")
+
+REQUIRED_COLUMNS = ['Request_ID', 'Rig', 'Start_Date', 'End_Date']
+INTEGER_COLUMNS = rig_store.INT32_COLUMNS
+NUMBER_COLUMNS = ['Cost_Estimate']
+TRUE_VALUES = {'true', '1', 'yes', 'y'}
+FALSE_VALUES = {'false', '0', 'no', 'n'}
+KNOWN_COLUMNS = rig_store.RIG_COLUMNS + [col for col in rig_store.REQUEST_COLUMNS if col != 'Rig']
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    reject_path: Path = None
+    # Sheets without a Request_ID header, e.g. a summary sheet
+    skipped_sheets: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+# --- READERS ---
+# Each yields (sheet name, chunk of raw values indexed by spreadsheet row)
+def read_csv_chunks(path, chunk_rows=IMPORT_CHUNK_ROWS):
+    # Everything as text, so validation sees exactly what the file holds
+    name = getattr(path, 'name', str(path))
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        # Line numbers as in a spreadsheet, header on row 1
+        chunk.index = chunk.index + 2
+        yield Path(name).name, chunk
+
+def read_excel_chunks(path, chunk_rows=IMPORT_CHUNK_ROWS, skipped=None):
+    # Read-only mode streams rows from the sheet XML instead of building
+    # the whole workbook in memory
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = [None if name is None else str(name).strip() for name in next(rows, ())]
+            if 'Request_ID' not in header:
+                if skipped is not None:
+                    skipped.append(sheet.title)
+                continue
+            values, numbers = [], []
+            for number, row in enumerate(rows, start=2):
+                if all(value is None for value in row):
+                    continue
+                values.append(row[:len(header)])
+                numbers.append(number)
+                if len(values) == chunk_rows:
+                    yield sheet.title, excel_frame(values, header, numbers)
+                    values, numbers = [], []
+            if values:
+                yield sheet.title, excel_frame(values, header, numbers)
+    finally:
+        workbook.close()
+
+def excel_frame(values, header, numbers):
+    frame = pd.DataFrame(values, columns=header, index=numbers, dtype=object)
+    return frame[[col for col in frame.columns if col is not None]]
+
+def read_chunks(path, chunk_rows=IMPORT_CHUNK_ROWS, skipped=None):
+    name = getattr(path, 'name', str(path))
+    if Path(name).suffix.lower() in ('.xlsx', '.xlsm'):
+        return read_excel_chunks(path, chunk_rows, skipped)
+    return read_csv_chunks(path, chunk_rows)
+
+# --- VALIDATION ---
+def format_cell(value):
+    # Excel hands back typed cells; numeric-looking IDs such as 1001.0 read as "1001"
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def cell_text(values):
+    # Trimmed text of every cell, None for empty ones. CSV chunks are all
+    # strings and are trimmed by Arrow in one pass; typed Excel cells are
+    # formatted first
+    try:
+        text = pa.array(values, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        text = pa.array(values.map(format_cell), type=pa.string(), from_pandas=True)
+    text = pc.utf8_trim_whitespace(text)
+    text = pc.if_else(pc.equal(text, ""), pa.scalar(None, pa.string()), text)
+    return pd.Series(text.to_numpy(zero_copy_only=False), index=values.index, dtype=object)
+
+def validate_chunk(raw, seen_ids, known_rigs=None):
+    # (typed rows ready to upsert, rejected raw rows with a Reason). Each
+    # rejected row carries its first problem. seen_ids holds the Request_IDs
+    # accepted so far in this import; a repeat is rejected, not merged.
+    # known_rigs are the rigs already stored: a chunk without the rig
+    # columns cannot add one, so rows naming any other rig are rejected
+    raw = raw[[col for col in raw.columns if col in KNOWN_COLUMNS]]
+    missing = [col for col in REQUIRED_COLUMNS if col not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    reasons = pd.Series("", index=raw.index, dtype=object)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == "")] = reason
+
+    typed = {}
+    for col in raw.columns:
+        text = cell_text(raw[col])
+        empty = text.isna()
+        if col in REQUIRED_COLUMNS:
+            reject(empty, f"Missing {col}")
+        if col in rig_store.DATE_COLUMNS:
+            parsed = pd.to_datetime(text, errors='coerce')
+            reject(parsed.isna() & ~empty, f"Invalid date in {col}")
+        elif col in rig_store.BOOL_COLUMNS:
+            tokens = text.str.lower()
+            reject(~tokens.isin(TRUE_VALUES | FALSE_VALUES) & ~empty, f"Invalid boolean in {col}")
+            # Empty cells read as False, as in the CSV import
+            parsed = tokens.isin(TRUE_VALUES)
+        elif col in INTEGER_COLUMNS or col in NUMBER_COLUMNS:
+            parsed = pd.to_numeric(text, errors='coerce')
+            invalid = parsed.isna() & ~empty
+            if col in INTEGER_COLUMNS:
+                invalid |= parsed.notna() & (parsed != parsed.round())
+            reject(invalid, f"Invalid number in {col}")
+        elif col in rig_store.ORDERED_CATEGORY_COLUMNS:
+            levels = rig_store.ORDERED_CATEGORY_COLUMNS[col]
+            parsed = text.str.capitalize()
+            reject(~parsed.isin(levels) & ~empty, f"{col} must be one of {', '.join(levels)}")
+        else:
+            parsed = text
+        typed[col] = parsed
+    typed = pd.DataFrame(typed, index=raw.index)
+
+    reject(typed['End_Date'] < typed['Start_Date'], "End_Date before Start_Date")
+    if known_rigs is not None and not set(rig_store.RIG_COLUMNS) <= set(typed.columns):
+        reject(~typed['Rig'].isin(known_rigs), "Unknown Rig")
+    ids = typed['Request_ID']
+    reject(ids.duplicated() | ids.isin(seen_ids), "Duplicate Request_ID in import")
+    valid = reasons == ""
+    seen_ids.update(ids[valid])
+
+    rejected = raw[~valid].assign(Reason=reasons[~valid])
+    typed = typed[valid].astype({col: 'Int64' for col in INTEGER_COLUMNS if col in typed.columns})
+    return rig_store.apply_schema(typed.reset_index(drop=True), copy=False), rejected
+
+def write_rejects(rejected, sheet, reject_path, first):
+    # Appended per chunk, so the reject file is never held in memory
+    rejected = rejected.rename_axis('Row').reset_index()
+    rejected.insert(0, 'Sheet', sheet)
+    rejected.to_csv(reject_path, mode='w' if first else 'a', header=first, index=False)
+
+# --- TARGETS ---
+class SqliteTarget:
+    # One transaction per batch; readers keep going between batches, and
+    # every commit bumps the data version the dashboard caches on
+    def __init__(self, path=rig_sqlite.DB_FILE):
+        self.path = path
+        rig_sqlite.initialize(path)
+
+    def upsert(self, batch):
+        rigs = None
+        if set(rig_store.RIG_COLUMNS) <= set(batch.columns):
+            rigs = rig_ingest.latest_rows(batch[rig_store.RIG_COLUMNS], 'Rig')
+        requests = batch[[col for col in rig_store.REQUEST_COLUMNS if col in batch.columns]]
+        rig_sqlite.upsert_rows(rigs, requests, self.path)
+
+    def rig_names(self):
+        return rig_sqlite.rig_names(self.path)
+
+    def finish(self):
+        pass
+
+class ParquetTarget:
+    # Validated batches are staged as Parquet files in a temporary directory
+    # and merged into the tables once, in finish(): upserting per batch would
+    # rebuild every column of the whole table each time. Until then only one
+    # batch and the rigs table are in memory; the merge itself holds the
+    # stored tables plus the staged rows, as any Parquet rewrite must
+    def __init__(self, rigs_path=rig_store.RIGS_FILE, requests_path=rig_store.REQUESTS_FILE):
+        self.rigs_path, self.requests_path = rigs_path, requests_path
+        if rig_store.tables_exist(rigs_path, requests_path):
+            self.known_rigs = set(rig_store.read_table(rigs_path, ['Rig'])['Rig'].astype(str))
+        else:
+            self.known_rigs = set()
+        self._staging = tempfile.TemporaryDirectory(prefix="rig-import-")
+        # Column set -> staged files, merged group by group so that a sheet
+        # without some column leaves it untouched rather than blanking it
+        self._staged = {}
+
+    def upsert(self, batch):
+        columns = tuple(batch.columns)
+        path = Path(self._staging.name) / f"batch-{sum(map(len, self._staged.values())):06d}.parquet"
+        batch.to_parquet(path, index=False)
+        self._staged.setdefault(columns, []).append(path)
+        if set(rig_store.RIG_COLUMNS) <= set(columns):
+            self.known_rigs.update(batch['Rig'].astype(str))
+
+    def rig_names(self):
+        # Includes rigs added by earlier batches of this import
+        return self.known_rigs
+
+    def finish(self):
+        try:
+            if not self._staged and rig_store.tables_exist(self.rigs_path, self.requests_path):
+                return
+            if rig_store.tables_exist(self.rigs_path, self.requests_path):
+                rigs = rig_store.read_table(self.rigs_path)
+                requests = rig_store.read_table(self.requests_path)
+            else:
+                rigs = rig_store.apply_schema(pd.DataFrame(columns=rig_store.RIG_COLUMNS))
+                requests = rig_store.apply_schema(pd.DataFrame(columns=rig_store.REQUEST_COLUMNS))
+            id_positions = dict(zip(requests['Request_ID'], range(len(requests))))
+            for paths in self._staged.values():
+                rows = rig_store.apply_schema(
+                    pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True), copy=False)
+                rigs = rig_ingest.upsert_rigs(rigs, rows)
+                positions, changed, added = rig_ingest.request_changes(requests, id_positions, rows)
+                if len(positions) or len(added):
+                    first_added = len(requests)
+                    requests = rig_ingest.upsert_frame(requests, positions, changed, added)
+                    id_positions.update(zip(added['Request_ID'], range(first_added, len(requests))))
+            rig_store.write_tables(rigs, requests, self.rigs_path, self.requests_path)
+        finally:
+            self._staging.cleanup()
+
+def default_reject_path(source, reject_dir=None):
+    # In reject_dir if given, else next to the source file; an uploaded file
+    # object has only a name and goes to REJECT_DIR
+    name = Path(getattr(source, 'name', str(source))).name
+    if reject_dir is None:
+        reject_dir = Path(source).parent if isinstance(source, (str, Path)) else REJECT_DIR
+    reject_dir = Path(reject_dir)
+    reject_dir.mkdir(parents=True, exist_ok=True)
+    return reject_dir / (name + REJECT_SUFFIX)
+
+def import_file(source, target, chunk_rows=IMPORT_CHUNK_ROWS, reject_path=None, progress=None, reject_dir=None):
+    # Streams source (a path or an uploaded file object) into target.
+    # progress(report) is called after every batch
+    report = ImportReport(reject_path=Path(reject_path) if reject_path else default_reject_path(source, reject_dir))
+    started = time.perf_counter()
+    seen_ids = set()
+    for sheet, raw in read_chunks(source, chunk_rows, report.skipped_sheets):
+        batch, rejected = validate_chunk(raw, seen_ids, target.rig_names())
+        if len(rejected):
+            write_rejects(rejected, sheet, report.reject_path, first=not report.rows_rejected)
+        if len(batch):
+            target.upsert(batch)
+        report.rows_read += len(raw)
+        report.rows_imported += len(batch)
+        report.rows_rejected += len(rejected)
+        report.batches += 1
+        report.seconds = time.perf_counter() - started
+        if progress is not None:
+            progress(report)
+    target.finish()
+    report.seconds = time.perf_counter() - started
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Excel or CSV request drops into the data store")
+    parser.add_argument('files', nargs='+', type=Path)
+    parser.add_argument('--storage', choices=['parquet', 'sqlite'], default='parquet')
+    parser.add_argument('--chunk-rows', type=int, default=IMPORT_CHUNK_ROWS)
+    parser.add_argument('--reject-dir', type=Path, help="Directory for reject files (default: next to each file)")
+    args = parser.parse_args(argv)
+
+    def progress(report):
+        print(f"  {report.rows_read} rows, {report.rows_per_second:,.0f} rows/s", end="\r", flush=True)
+
+    for path in args.files:
+        target = SqliteTarget() if args.storage == 'sqlite' else ParquetTarget()
+        report = import_file(path, target, args.chunk_rows, progress=progress, reject_dir=args.reject_dir)
+        print(f"{path}: {report.rows_imported} imported, {report.rows_rejected} rejected of "
+              f"{report.rows_read} rows in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+        if report.rows_rejected:
+            print(f"  rejected rows and reasons: {report.reject_path}")
+        if report.skipped_sheets:
+            print(f"  skipped sheets without a Request_ID column: {', '.join(report.skipped_sheets)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+# --- COLUMN MASKS ---
+def category_mask(series, values, rows=None):
+    # isin evaluated on integer category codes, optionally only at the given
+    # positions, so filters combine into one mask and one final take
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        wanted = series.cat.categories.get_indexer(pd.Index(list(values), dtype=object))
+        codes = series.cat.codes.to_numpy()
+        if rows is not None:
+            codes = codes[rows]
+        return np.isin(codes, wanted[wanted >= 0])
+    values_array = series.to_numpy() if rows is None else series.to_numpy()[rows]
+    return np.isin(values_array, list(values))
+
+# --- DUE-DATE INDEX ---
+def to_datetime64(value):
+    return pd.Timestamp(value).to_datetime64()
+
+def sorted_replace(keys, rows, new_keys, new_rows, extra=(), new_extra=()):
+    # Drops any entries for new_rows from arrays sorted by key, then inserts
+    # the new entries by binary search instead of re-sorting. Ties go after
+    # the existing entries, where a stable sort puts appended rows
+    keep = ~np.isin(rows, new_rows)
+    order = np.argsort(new_keys, kind='stable')
+    at = np.searchsorted(keys[keep], new_keys[order], side='right')
+    return tuple(np.insert(old[keep], at, new[order])
+                 for old, new in zip((keys, rows, *extra), (new_keys, new_rows, *new_extra)))
+
+class DueDateIndex:
+    # Request positions sorted by End_Date, kept for all requests and for open
+    # (not yet complete) ones. Window queries are two binary searches plus a
+    # slice, so they cost O(log n + k) instead of a full-table mask.
+    def __init__(self, end_dates, open_mask):
+        ends = np.asarray(end_dates, dtype='datetime64[ns]')
+        open_mask = np.asarray(open_mask, dtype=bool)
+        order = np.argsort(ends, kind='stable')
+        self.ends = ends[order]
+        self.rows = order
+        open_rows = order[open_mask[order]]
+        self.open_ends = ends[open_rows]
+        self.open_rows = open_rows
+
+    @classmethod
+    def from_requests(cls, requests):
+        return cls(requests['End_Date'].to_numpy(), ~requests['Action_Complete'].to_numpy(dtype=bool))
+
+    @classmethod
+    def from_sorted(cls, ends, rows, open_ends, open_rows):
+        # Wraps arrays that are already sorted, e.g. mapped from a snapshot
+        index = cls.__new__(cls)
+        index.ends, index.rows, index.open_ends, index.open_rows = ends, rows, open_ends, open_rows
+        return index
+
+    def __len__(self):
+        return len(self.rows)
+
+    def replace_rows(self, rows, end_dates, open_mask):
+        # Copy with the given positions entered under their new End_Date and
+        # open state, e.g. after a few requests were added or completed
+        rows = np.asarray(rows, dtype=self.rows.dtype)
+        ends = np.asarray(end_dates, dtype='datetime64[ns]')
+        open_mask = np.asarray(open_mask, dtype=bool)
+        index = DueDateIndex.__new__(DueDateIndex)
+        index.ends, index.rows = sorted_replace(self.ends, self.rows, ends, rows)
+        # Rows that are no longer open leave the open arrays for good
+        still_open = ~np.isin(self.open_rows, rows)
+        index.open_ends, index.open_rows = sorted_replace(
+            self.open_ends[still_open], self.open_rows[still_open], ends[open_mask], rows[open_mask])
+        return index
+
+    def _bounds(self, start, end, open_only, left_closed, right_closed):
+        ends = self.open_ends if open_only else self.ends
+        lo = 0 if start is None else np.searchsorted(
+            ends, to_datetime64(start), side='left' if left_closed else 'right')
+        hi = len(ends) if end is None else np.searchsorted(
+            ends, to_datetime64(end), side='right' if right_closed else 'left')
+        return lo, max(lo, hi)
+
+    def between(self, start, end, open_only=True, left_closed=True, right_closed=True):
+        # Positions (for .iloc) of requests due in the window, earliest first
+        lo, hi = self._bounds(start, end, open_only, left_closed, right_closed)
+        return (self.open_rows if open_only else self.rows)[lo:hi]
+
+    def count_between(self, start, end, open_only=True, left_closed=True, right_closed=True):
+        lo, hi = self._bounds(start, end, open_only, left_closed, right_closed)
+        return int(hi - lo)
+
+    def due_within(self, now, days, open_only=True):
+        # Due in [now, now + days]
+        return self.between(now, pd.Timestamp(now) + pd.Timedelta(days=days), open_only)
+
+    def upcoming(self, now, days):
+        # Due in (now, now + days]
+        return self.between(now, pd.Timestamp(now) + pd.Timedelta(days=days), left_closed=False)
+
+    def overdue(self, now):
+        return self.between(None, now, right_closed=False)
+
+    def count_upcoming(self, now, days):
+        return self.count_between(now, pd.Timestamp(now) + pd.Timedelta(days=days), left_closed=False)
+
+    def count_overdue(self, now):
+        return self.count_between(None, now, right_closed=False)
+
+# --- WINDOW (INTERVAL) INDEX ---
+class WindowIndex:
+    # [start, end] windows sorted by start, plus the longest window length.
+    # A window overlapping [lo, hi] must start within [lo - longest, hi], so
+    # every query binary-searches that start range and only checks the ends
+    # of the candidates inside it: O(log n + k) for bounded window lengths.
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype='datetime64[ns]')
+        ends = np.asarray(ends, dtype='datetime64[ns]')
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.rows = order
+        lengths = ends - starts
+        self.longest = max(lengths.max(), np.timedelta64(0, 'ns')) if len(lengths) else np.timedelta64(0, 'ns')
+
+    @classmethod
+    def from_frame(cls, frame, start_column, end_column):
+        return cls(frame[start_column].to_numpy(), frame[end_column].to_numpy())
+
+    @classmethod
+    def from_sorted(cls, starts, ends, rows):
+        # Wraps arrays that are already sorted by start, e.g. mapped from a snapshot
+        index = cls.__new__(cls)
+        index.starts, index.ends, index.rows = starts, ends, rows
+        index.longest = max((ends - starts).max(), np.timedelta64(0, 'ns')) if len(rows) else np.timedelta64(0, 'ns')
+        return index
+
+    def __len__(self):
+        return len(self.rows)
+
+    def replace_rows(self, rows, starts, ends):
+        # Copy with the given positions entered under their new windows. The
+        # longest length only ever grows, which keeps the candidate range wide
+        # enough for every query
+        starts = np.asarray(starts, dtype='datetime64[ns]')
+        ends = np.asarray(ends, dtype='datetime64[ns]')
+        index = WindowIndex.__new__(WindowIndex)
+        index.starts, index.rows, index.ends = sorted_replace(
+            self.starts, self.rows, starts, np.asarray(rows, dtype=self.rows.dtype), (self.ends,), (ends,))
+        index.longest = max(self.longest, (ends - starts).max()) if len(starts) else self.longest
+        return index
+
+    def _candidates(self, lo, hi):
+        first = np.searchsorted(self.starts, lo, side='left')
+        last = np.searchsorted(self.starts, hi, side='right')
+        return slice(first, max(first, last))
+
+    def _select(self, window, keep):
+        # Positions (for .iloc) in original row order
+        return np.sort(self.rows[window][keep])
+
+    def contained(self, start, end):
+        start, end = to_datetime64(start), to_datetime64(end)
+        window = self._candidates(start, end)
+        return self._select(window, self.ends[window] <= end)
+
+    def overlapping(self, start, end):
+        start, end = to_datetime64(start), to_datetime64(end)
+        window = self._candidates(start - self.longest, end)
+        return self._select(window, self.ends[window] >= start)
+
+    def active_at(self, instant):
+        return self.overlapping(instant, instant)
+
+    def query(self, mode, start, end=None):
+        if mode == 'contained':
+            return self.contained(start, end)
+        if mode == 'overlapping':
+            return self.overlapping(start, end)
+        if mode == 'active':
+            return self.active_at(start)
+        raise ValueError(f"Unknown date filter mode: {mode}")
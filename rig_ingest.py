@@ -0,0 +1,184 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+import rig_store
+
+# --- CSV FEED ---
+# The part of the file already read is hashed in blocks of this size
+DIGEST_BLOCK_BYTES = 1 << 20
+
+@dataclass(frozen=True)
+class FeedPosition:
+    offset: int
+    header: bytes
+    # Digest of every byte before offset, so an edit anywhere in the part
+    # already read shows, not only one near its end
+    digest: bytes
+
+def new_digest():
+    return hashlib.blake2b(digest_size=16)
+
+def prefix_digest(f, offset):
+    # Running hash of the first offset bytes, left open to extend
+    digest = new_digest()
+    f.seek(0)
+    remaining = offset
+    while remaining:
+        block = f.read(min(DIGEST_BLOCK_BYTES, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest
+
+def read_feed(path, position=None):
+    # Flat rows added to an append-mostly CSV since position, plus the new
+    # position. The file counts as appended to only if it grew and every byte
+    # read before is unchanged; hashing them costs a read of the file, far
+    # less than parsing it. Appends are parsed from the saved offset up to
+    # the last complete line. Anything else (an in-place edit at any size, a
+    # shrink, a rewrite) is parsed in full, and the caller's diff by
+    # Request_ID keeps the delta to the rows that actually changed
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        digest = None
+        if position is not None and position.offset < size:
+            digest = prefix_digest(f, position.offset)
+            if digest.digest() != position.digest:
+                digest = None
+        if digest is not None:
+            header = position.header
+            # prefix_digest left the file at the saved offset
+            chunk = f.read()
+            # A writer may be halfway through a line; it is picked up next time
+            end = chunk.rfind(b"\n") + 1
+        else:
+            f.seek(0)
+            header = f.readline()
+            chunk = f.read()
+            # Rewrites are complete by the time they are seen, last line included
+            end = len(chunk)
+            digest = new_digest()
+            digest.update(header)
+        digest.update(chunk[:end])
+        offset = size - len(chunk) + end
+
+    if end:
+        rows = rig_store.apply_schema(pd.read_csv(BytesIO(header + chunk[:end])), copy=False)
+    else:
+        rows = pd.DataFrame()
+    return rows, FeedPosition(offset, header, digest.digest())
+
+# --- DELTAS BY REQUEST_ID ---
+# Stands in for missing values so that two of them compare equal
+MISSING = object()
+
+def comparable(series):
+    values = series.to_numpy(dtype=object)
+    values[pd.isna(values)] = MISSING
+    return values
+
+def latest_rows(rows, key):
+    # Last version of each key, ordered by first appearance so that new rows
+    # land in the same order however the feed was batched
+    latest = rows[~rows[key].duplicated(keep='last')]
+    first_seen = pd.Index(rows[key].drop_duplicates()).get_indexer(latest[key])
+    return latest.iloc[np.argsort(first_seen, kind='stable')]
+
+def split_changes(frame, rows, positions):
+    # (positions, changed rows, added rows) for rows matched to frame
+    # positions (-1 for new keys): matched rows are kept only if some column
+    # differs from the current value. Only the delta is compared
+    known = positions >= 0
+    positions, existing = positions[known], rows[known]
+    differs = np.zeros(len(positions), dtype=bool)
+    for col in rows.columns:
+        differs |= comparable(frame[col].iloc[positions]) != comparable(existing[col])
+    return positions[differs], existing[differs], rows[~known]
+
+def changed_columns(frame, positions, changed):
+    # Columns in which at least one changed row actually differs
+    return [col for col in changed.columns
+            if (comparable(frame[col].iloc[positions]) != comparable(changed[col])).any()]
+
+def upsert_column(values, positions, changed, added):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Worked on the integer codes; categories seen for the first time are
+        # appended, so existing codes and the categories' hash table stay valid
+        categories = values.cat.categories
+        new_values = pd.Index(pd.concat([changed, added]).astype(object).dropna().unique())
+        unseen = new_values.difference(categories)
+        if len(unseen):
+            categories = categories.append(unseen)
+        codes = np.concatenate([values.cat.codes.to_numpy(), categories.get_indexer(added.astype(object))])
+        codes[positions] = categories.get_indexer(changed.astype(object))
+        dtype = pd.CategoricalDtype(categories, ordered=values.cat.ordered)
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), name=values.name)
+    dtype = values.dtype
+    if dtype.kind == 'i' and (changed.isna().any() or added.isna().any()):
+        # A blank integer cell: widened to the nullable dtype apply_schema
+        # reads such a column as, e.g. int32 -> Int32
+        dtype = pd.api.types.pandas_dtype(dtype.name.capitalize())
+        values = values.astype(dtype)
+    column = pd.concat([values, added.astype(dtype)], ignore_index=True) if len(added) else values.copy()
+    if len(positions):
+        column.iloc[positions] = changed.astype(dtype).to_numpy()
+    return column
+
+def upsert_frame(frame, positions, changed, added):
+    # New frame with the changed rows overwritten in place and the added rows
+    # appended, so existing positions stay valid
+    columns = {}
+    for col in frame.columns:
+        if col in changed.columns:
+            columns[col] = upsert_column(frame[col].reset_index(drop=True), positions, changed[col], added[col])
+        elif len(added):
+            # Not in the feed: kept on changed rows, missing on added ones
+            filler = pd.Series([None] * len(added), dtype=object)
+            columns[col] = pd.concat([frame[col], filler], ignore_index=True)
+        else:
+            columns[col] = frame[col].copy()
+    # Only columns widened by missing values are converted back
+    return rig_store.apply_schema(pd.DataFrame(columns), copy=False)
+
+def request_changes(requests, id_positions, rows):
+    if 'Request_ID' not in rows.columns:
+        raise ValueError("Feed rows have no Request_ID column")
+    rows = latest_rows(rows, 'Request_ID')[[col for col in requests.columns if col in rows.columns]]
+    positions = np.fromiter((id_positions.get(request_id, -1) for request_id in rows['Request_ID']),
+                            dtype=np.intp, count=len(rows))
+    # The lookup is shared with newer versions; rows this one lacks are new here
+    positions[positions >= len(requests)] = -1
+    return split_changes(requests, rows, positions)
+
+def upsert_rigs(rigs, rows):
+    # Flat feed rows repeat the rig fields; the last value seen per rig wins
+    if not len(rows) or not set(rig_store.RIG_COLUMNS) <= set(rows.columns):
+        return rigs
+    rows = latest_rows(rows[rig_store.RIG_COLUMNS], 'Rig')
+    # Rig names are categories of the rigs table; map category code -> position
+    codes = rigs['Rig'].cat.codes.to_numpy()
+    code_positions = np.full(len(rigs['Rig'].cat.categories), -1, dtype=np.intp)
+    code_positions[codes[codes >= 0]] = np.flatnonzero(codes >= 0)
+    found = rigs['Rig'].cat.categories.get_indexer(rows['Rig'].astype(object))
+    positions = np.full(len(found), -1, dtype=np.intp)
+    positions[found >= 0] = code_positions[found[found >= 0]]
+    positions, changed, added = split_changes(rigs, rows, positions)
+    if not len(positions) and not len(added):
+        return rigs
+    return upsert_frame(rigs, positions, changed, added)
+
+def overlay_rows(requests, rows):
+    # One-off upsert of feed rows onto a full table, e.g. for exports
+    id_positions = dict(zip(requests['Request_ID'], range(len(requests))))
+    return upsert_frame(requests, *request_changes(requests, id_positions, rows))
+
+def apply_feed(dataset, version, path):
+    # New dataset with whatever the feed gained since the dataset's position
+    rows, position = read_feed(path, dataset.feed)
+    return dataset.apply_rows(version, rows, feed=position)
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+UPCOMING_DAYS = 7
+
+# --- KPI RESULT ---
+@dataclass(frozen=True)
+class KpiSummary:
+    total_rigs: int
+    active_rigs: int
+    total_requests: int
+    completed_requests: int
+    completion_rate: float
+    monthly_requests: int
+    monthly_completed: int
+    upcoming_tasks: int
+    overdue_tasks: int
+
+def month_key(values):
+    # Calendar month as a single integer so year and month compare together
+    values = pd.DatetimeIndex(values)
+    return values.year.to_numpy() * 12 + values.month.to_numpy() - 1
+
+def completion_rate(completed, total):
+    return completed / total * 100 if total else 0.0
+
+def due_counts(end, complete, now):
+    # Open requests only; upcoming is (now, now + 7d], overdue is before now
+    open_end = end[~complete]
+    upcoming = np.count_nonzero((open_end > now) & (open_end <= now + np.timedelta64(UPCOMING_DAYS, 'D')))
+    overdue = np.count_nonzero(open_end < now)
+    return int(upcoming), int(overdue)
+
+# --- SINGLE-PASS ENGINE ---
+def compute_kpis(rigs, requests, now=None, rollup=None, due_index=None):
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    current_month = month_key([now])[0]
+
+    complete = requests['Action_Complete'].to_numpy(dtype=bool)
+    if due_index is not None:
+        # Binary searches over the sorted open End_Date array
+        upcoming = due_index.count_upcoming(now, UPCOMING_DAYS)
+        overdue = due_index.count_overdue(now)
+    else:
+        upcoming, overdue = due_counts(requests['End_Date'].to_numpy(), complete, now.to_datetime64())
+
+    if rollup is not None:
+        # Calendar counts come from the materialized rollup, not the rows
+        total, completed, monthly_requests, monthly_completed = rollup.totals(current_month)
+    else:
+        start_month = month_key(requests['Start_Date'])
+        end_month = month_key(requests['End_Date'])
+        total = len(requests)
+        completed = int(np.count_nonzero(complete))
+        monthly_requests = int(np.count_nonzero(start_month == current_month))
+        monthly_completed = int(np.count_nonzero(complete & (end_month == current_month)))
+
+    return KpiSummary(
+        total_rigs=len(rigs),
+        active_rigs=int(np.count_nonzero(rigs['Rig_Status'].to_numpy() == 'Active')),
+        total_requests=total,
+        completed_requests=completed,
+        completion_rate=completion_rate(completed, total),
+        monthly_requests=monthly_requests,
+        monthly_completed=monthly_completed,
+        upcoming_tasks=upcoming,
+        overdue_tasks=overdue
+    )
+
+# --- MATERIALIZED PER-RIG, PER-MONTH ROLLUPS ---
+ROLLUP_COLUMNS = ['Started', 'Completed']
+
+def rollup_contributions(requests):
+    # 'Started' counts requests by start month, 'Completed' counts completed
+    # requests by end month; both keyed by (Rig, Month)
+    rig = requests['Rig'].astype(str).to_numpy()
+    started = pd.DataFrame({'Rig': rig, 'Month': month_key(requests['Start_Date']), 'Started': 1})
+    done = requests['Action_Complete'].to_numpy(dtype=bool)
+    completed = pd.DataFrame({
+        'Rig': rig[done],
+        'Month': month_key(requests['End_Date'])[done],
+        'Completed': 1
+    })
+    return (pd.concat([started, completed], ignore_index=True)
+            .fillna(0)
+            .groupby(['Rig', 'Month'])[ROLLUP_COLUMNS]
+            .sum()
+            .astype('int64'))
+
+class KpiRollup:
+    def __init__(self, table=None):
+        if table is None:
+            index = pd.MultiIndex.from_arrays([[], []], names=['Rig', 'Month'])
+            table = pd.DataFrame(0, index=index, columns=ROLLUP_COLUMNS, dtype='int64')
+        self.table = table
+
+    @classmethod
+    def from_requests(cls, requests):
+        return cls(rollup_contributions(requests))
+
+    def apply(self, removed=None, added=None):
+        # Incremental update: subtract the old versions of changed or deleted
+        # rows and add the new or inserted ones; cost scales with the delta
+        delta = None
+        for rows, sign in ((removed, -1), (added, 1)):
+            if rows is not None and len(rows):
+                part = rollup_contributions(rows) * sign
+                delta = part if delta is None else delta.add(part, fill_value=0)
+        if delta is None:
+            return self
+
+        table = self.table
+        at = table.index.get_indexer(delta.index)
+        if (at >= 0).all():
+            # Only existing (Rig, Month) cells change: add into a copy of the
+            # values and keep the index, whose hash table the next update reuses
+            values = table.to_numpy().copy()
+            values[at] += delta[ROLLUP_COLUMNS].to_numpy(dtype='int64')
+            if values[at].any(axis=1).all():
+                self.table = pd.DataFrame(values, index=table.index, columns=ROLLUP_COLUMNS)
+                return self
+        # New cells, or cells that dropped to zero and leave the table
+        table = table.add(delta, fill_value=0).astype('int64')
+        self.table = table[(table != 0).any(axis=1)]
+        return self
+
+    def totals(self, month):
+        table = self.table
+        in_month = table.index.get_level_values('Month') == month
+        return (
+            int(table['Started'].sum()),
+            int(table['Completed'].sum()),
+            int(table.loc[in_month, 'Started'].sum()),
+            int(table.loc[in_month, 'Completed'].sum())
+        )
+
+    def by_rig(self):
+        return self.table.groupby(level='Rig').sum()
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# --- RERUN TIMING ---
+# Prometheus text is rewritten at most this often; JSON lines are appended per rerun
+FLUSH_SECONDS = 5.0
+
+class RerunTimer:
+    # Laps of one script run; each lap covers the time since the previous one,
+    # so the sections add up to the whole rerun. Two perf_counter calls per
+    # section are cheap enough to leave on.
+    def __init__(self):
+        self.started = time.time()
+        self._last = time.perf_counter()
+        self.laps = []
+
+    def lap(self, section, rows=None):
+        now = time.perf_counter()
+        self.laps.append((section, now - self._last, rows))
+        self._last = now
+
+    def total(self):
+        return sum(seconds for _, seconds, _ in self.laps)
+
+# --- PROCESS-WIDE METRICS ---
+class MetricsSink:
+    # Aggregates laps across reruns and sessions and mirrors them to a file:
+    # Prometheus text format, or JSON lines when the file ends in .jsonl
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._flushed = 0.0
+        self.reruns = 0
+        # section -> [runs, total seconds, total rows, last seconds]
+        self.sections = {}
+
+    def record(self, timer):
+        with self._lock:
+            self.reruns += 1
+            for section, seconds, rows in timer.laps:
+                stats = self.sections.setdefault(section, [0, 0.0, 0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] += rows or 0
+                stats[3] = seconds
+            if self.path is not None:
+                self._write(timer)
+
+    def _write(self, timer):
+        if self.path.suffix == '.jsonl':
+            line = json.dumps({
+                'time': timer.started,
+                'total_seconds': timer.total(),
+                'sections': [{'section': section, 'seconds': seconds, 'rows': rows}
+                             for section, seconds, rows in timer.laps]
+            })
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+        elif time.monotonic() - self._flushed >= FLUSH_SECONDS:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(self.prometheus_text())
+            # Scrapers never read a half-written file
+            os.replace(tmp_path, self.path)
+            self._flushed = time.monotonic()
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP rig_dashboard_reruns_total Dashboard script runs recorded.",
+            "# TYPE rig_dashboard_reruns_total counter",
+            f"rig_dashboard_reruns_total {self.reruns}",
+            "# HELP rig_dashboard_section_seconds Time spent per dashboard section.",
+            "# TYPE rig_dashboard_section_seconds summary"
+        ]
+        for section, (runs, seconds, _, _) in self.sections.items():
+            lines.append(f'rig_dashboard_section_seconds_sum{{section="{section}"}} {seconds:.6f}')
+            lines.append(f'rig_dashboard_section_seconds_count{{section="{section}"}} {runs}')
+        lines += [
+            "# HELP rig_dashboard_section_last_seconds Time of the most recent run of each section.",
+            "# TYPE rig_dashboard_section_last_seconds gauge"
+        ]
+        for section, stats in self.sections.items():
+            lines.append(f'rig_dashboard_section_last_seconds{{section="{section}"}} {stats[3]:.6f}')
+        lines += [
+            "# HELP rig_dashboard_section_rows_total Rows handled per dashboard section.",
+            "# TYPE rig_dashboard_section_rows_total counter"
+        ]
+        for section, stats in self.sections.items():
+            lines.append(f'rig_dashboard_section_rows_total{{section="{section}"}} {stats[2]}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        # (section, runs, mean seconds, last seconds, total rows) per section
+        with self._lock:
+            return [(section, runs, seconds / runs, last, rows)
+                    for section, (runs, seconds, rows, last) in self.sections.items()]
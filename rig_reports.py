@@ -0,0 +1,112 @@
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+
+import pandas as pd
+
+import rig_export
+import rig_metrics
+import rig_sqlite
+import rig_store
+
+# --- HEADLESS BATCH REPORTS ---
+# Per-rig or per-requestor KPI tables and exports for the whole fleet in one
+# run, without Streamlit. Groups are independent, so they are fanned out over
+# a process pool in batches.
+GROUP_COLUMNS = {'rig': 'Rig', 'requestor': 'Requestor'}
+EXPORT_SUFFIXES = {'csv': '.csv', 'excel': '.xlsx'}
+# Batches per worker; more batches even out uneven group sizes
+BATCHES_PER_WORKER = 4
+
+def load_tables(storage='parquet'):
+    # All request columns, for reports and exports
+    if storage == 'sqlite':
+        return rig_sqlite.read_rigs(), rig_sqlite.read_requests()
+    return rig_store.read_table(rig_store.RIGS_FILE), rig_store.read_table(rig_store.REQUESTS_FILE)
+
+def default_workers():
+    # Cores this process may run on, which can be fewer than the machine has
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def safe_name(value):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)).strip('_') or 'unnamed'
+
+def write_export(frame, path, kind):
+    if kind == 'excel':
+        rig_export.write_excel(frame, path)
+    else:
+        frame.to_csv(path, index=False)
+
+def group_report(key, rigs, requests, now, output_dir=None, formats=()):
+    # KPI row for one group, plus its export files
+    group_rigs = rigs[rigs['Rig'].isin(requests['Rig'])]
+    row = {'Group': key, **asdict(rig_metrics.compute_kpis(group_rigs, requests, now=now))}
+    if formats:
+        flat = rig_store.join_tables(group_rigs, requests)
+        for kind in formats:
+            write_export(flat, Path(output_dir) / f"{safe_name(key)}{EXPORT_SUFFIXES[kind]}", kind)
+    return row
+
+def report_batch(batch, rigs, now, output_dir, formats):
+    # Runs in a worker process; batch is a list of (key, requests) pairs
+    return [group_report(key, rigs, requests, now, output_dir, formats) for key, requests in batch]
+
+def make_batches(groups, num_batches):
+    # Largest groups first, dealt round-robin so batches get similar work
+    groups = sorted(groups, key=lambda group: len(group[1]), reverse=True)
+    return [batch for batch in (groups[i::num_batches] for i in range(num_batches)) if batch]
+
+def build_reports(rigs, requests, by='rig', now=None, output_dir=None, formats=(), workers=None):
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    column = GROUP_COLUMNS[by]
+    if formats:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    groups = [(str(key), frame) for key, frame in requests.groupby(column, observed=True)]
+    workers = min(workers or default_workers(), max(len(groups), 1))
+
+    if workers == 1:
+        rows = report_batch(groups, rigs, now, output_dir, formats)
+    else:
+        batches = make_batches(groups, workers * BATCHES_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(report_batch, batch, rigs, now, output_dir, formats) for batch in batches]
+            rows = [row for future in futures for row in future.result()]
+
+    report = pd.DataFrame(rows).rename(columns={'Group': column})
+    return report.sort_values(column).reset_index(drop=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate fleet-wide KPI reports and exports")
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--by', choices=list(GROUP_COLUMNS), default='rig')
+    parser.add_argument('--formats', nargs='*', choices=list(EXPORT_SUFFIXES), default=['excel'],
+                        help="per-group export files; none for the KPI table only")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--storage', choices=['parquet', 'sqlite'], default='parquet')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    rigs, requests = load_tables(args.storage)
+    report = build_reports(rigs, requests, args.by, output_dir=args.output_dir / args.by,
+                           formats=args.formats, workers=args.workers)
+
+    # Fleet-wide KPI table and exports next to the per-group files
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    report.to_csv(args.output_dir / f"kpis_by_{args.by}.csv", index=False)
+    flat = rig_store.join_tables(rigs, requests)
+    for kind in args.formats:
+        write_export(flat, args.output_dir / f"rig_operations{EXPORT_SUFFIXES[kind]}", kind)
+
+    print(f"{len(report)} {args.by} reports for {len(requests)} requests written to "
+          f"{args.output_dir} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
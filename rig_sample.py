@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import rig_store
+
+# --- SAMPLE VOCABULARY ---
+RIG_NAMES = [
+    "Deepwater Horizon", "Ocean Explorer", "Sea Guardian", "Marine Pioneer",
+    "Offshore Venture", "Blue Wave", "Pacific Driller", "Atlantic Explorer",
+    "Coastal Defender", "North Star", "Southern Cross", "Eastern Horizon",
+    "Western Pioneer", "Arctic Explorer", "Pacific Guardian"
+]
+
+REQUESTORS = [
+    "Client A - Operations", "Client B - Procurement", "Supplier X - Logistics",
+    "Internal Team - Maintenance", "Regulatory Body - Compliance", "Safety Officer",
+    "Technical Department", "Finance Division", "Environmental Team"
+]
+
+ACTIONS = [
+    "Supply Delivery", "Maintenance Schedule", "Safety Audit", "Personnel Change",
+    "Data Submission", "Equipment Inspection", "Environmental Check", "Emergency Drill",
+    "System Upgrade", "Training Session", "Documentation Review", "Quality Assurance"
+]
+
+def uniform(values):
+    return {value: 1.0 for value in values}
+
+# --- DISTRIBUTIONS ---
+@dataclass(frozen=True)
+class SampleDistributions:
+    # Integer ranges are inclusive; choice weights are relative
+    rig_start_days_ago: tuple = (0, 60)
+    rig_duration_days: tuple = (30, 120)
+    request_duration_days: tuple = (1, 21)
+    cost_estimate: tuple = (1000.0, 50000.0)
+    team_size: tuple = (1, 12)
+    doable_probability: float = 0.5
+    # Only completed requests can have a response
+    response_probability: float = 0.5
+    actions: dict = field(default_factory=lambda: uniform(ACTIONS))
+    requestors: dict = field(default_factory=lambda: uniform(REQUESTORS))
+    priorities: dict = field(default_factory=lambda: uniform(["High", "Medium", "Low"]))
+    risk_levels: dict = field(default_factory=lambda: uniform(["Low", "Medium", "High"]))
+    environmental_impacts: dict = field(default_factory=lambda: uniform(["None", "Low", "Medium", "High"]))
+
+DEFAULT_DISTRIBUTIONS = SampleDistributions()
+
+# Rigs generated per chunk in streaming mode; ~10 requests per rig by default
+SAMPLE_CHUNK_RIGS = 10_000
+
+def rig_names(first, count):
+    numbers = np.arange(first, first + count)
+    fallback = "Rig_" + pd.Series(numbers + 1).astype(str).str.zfill(3)
+    named = numbers < len(RIG_NAMES)
+    fallback[named] = np.array(RIG_NAMES, dtype=object)[numbers[named]]
+    return fallback.to_numpy()
+
+def request_ids(first, count):
+    # Sequential numbers are unique across chunks by construction
+    return ("REQ-" + pd.Series(np.arange(first, first + count) + 1).astype(str).str.zfill(8)).to_numpy()
+
+def integers(rng, bounds, size):
+    return rng.integers(bounds[0], bounds[1] + 1, size=size)
+
+def categorical_choice(rng, weights, size):
+    # Categorical built straight from sampled codes, no per-row strings
+    values = list(weights)
+    p = np.array([weights[value] for value in values], dtype=float)
+    codes = rng.choice(len(values), size=size, p=p / p.sum())
+    return pd.Categorical.from_codes(codes, categories=values)
+
+# --- VECTORIZED GENERATION ---
+def generate_chunk(rng, first_rig, num_rigs, num_requests_per_rig, first_request, now, dist):
+    days = np.timedelta64(1, 'D')
+    now64 = now.to_datetime64()
+
+    # Rig operational periods
+    rig_start = now64 - integers(rng, dist.rig_start_days_ago, num_rigs) * days
+    rig_end = rig_start + integers(rng, dist.rig_duration_days, num_rigs) * days
+    rigs = pd.DataFrame({
+        'Rig': rig_names(first_rig, num_rigs),
+        'Rig_Start': rig_start,
+        'Rig_End': rig_end,
+        'Rig_Status': np.where(now64 > rig_end, "Complete", "Active")
+    })
+
+    # Requests within each rig's timeline, 1..num_requests_per_rig per rig
+    counts = rng.integers(1, num_requests_per_rig + 1, size=num_rigs)
+    owner = np.repeat(np.arange(num_rigs), counts)
+    size = len(owner)
+    span_days = (rig_end - rig_start)[owner] // days
+    start = rig_start[owner] + np.floor(rng.random(size) * (span_days + 1)).astype('int64') * days
+    duration = integers(rng, dist.request_duration_days, size)
+    end = start + duration * days
+    complete = now64 > end
+    low, high = dist.cost_estimate
+
+    requests = pd.DataFrame({
+        'Request_ID': request_ids(first_request, size),
+        'Rig': rigs['Rig'].to_numpy()[owner],
+        'Action_Requested': categorical_choice(rng, dist.actions, size),
+        'Requestor': categorical_choice(rng, dist.requestors, size),
+        'Start_Date': start,
+        'End_Date': end,
+        'Duration_Days': duration,
+        'Action_Doable': rng.random(size) < dist.doable_probability,
+        'Action_Complete': complete,
+        'Response_Provided': complete & (rng.random(size) < dist.response_probability),
+        'Priority': categorical_choice(rng, dist.priorities, size),
+        'Cost_Estimate': np.round(rng.uniform(low, high, size), 2),
+        'Team_Size': integers(rng, dist.team_size, size),
+        'Risk_Level': categorical_choice(rng, dist.risk_levels, size),
+        'Environmental_Impact': categorical_choice(rng, dist.environmental_impacts, size)
+    })
+    return rigs, requests
+
+def iter_sample_chunks(num_rigs, num_requests_per_rig=4, seed=None, chunk_rigs=SAMPLE_CHUNK_RIGS,
+                       distributions=DEFAULT_DISTRIBUTIONS, now=None):
+    # (rigs, requests) per block of rigs; output is reproducible for a given
+    # seed and chunk size
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    next_request = 0
+    for first_rig in range(0, num_rigs, chunk_rigs):
+        rigs, requests = generate_chunk(rng, first_rig, min(chunk_rigs, num_rigs - first_rig),
+                                        num_requests_per_rig, next_request, now, distributions)
+        next_request += len(requests)
+        yield rigs, requests
+
+def generate_sample_data(num_rigs=15, num_requests_per_rig=4, seed=None,
+                         distributions=DEFAULT_DISTRIBUTIONS, now=None):
+    chunks = iter_sample_chunks(num_rigs, num_requests_per_rig, seed, max(num_rigs, 1), distributions, now)
+    return next(chunks, (pd.DataFrame(columns=rig_store.RIG_COLUMNS),
+                         pd.DataFrame(columns=rig_store.REQUEST_COLUMNS)))
+
+# --- STREAMING OUTPUT ---
+def arrow_chunk(frame):
+    # Plain strings rather than per-chunk dictionaries, so every row group
+    # shares one schema; rig_store restores the categories on load
+    frame = frame.astype({col: str for col in frame.columns
+                          if isinstance(frame[col].dtype, pd.CategoricalDtype)})
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+def write_sample_data(output_dir, num_rigs, num_requests_per_rig=4, seed=None,
+                      chunk_rigs=SAMPLE_CHUNK_RIGS, distributions=DEFAULT_DISTRIBUTIONS, now=None):
+    # Writes rigs.parquet and requests.parquet one chunk (row group) at a
+    # time, so memory is bounded by the chunk size rather than the total
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    writers = {}
+    totals = {'rigs': 0, 'requests': 0}
+    try:
+        for rigs, requests in iter_sample_chunks(num_rigs, num_requests_per_rig, seed, chunk_rigs,
+                                                 distributions, now):
+            for name, path, frame in (('rigs', rig_store.RIGS_FILE, rigs),
+                                      ('requests', rig_store.REQUESTS_FILE, requests)):
+                table = arrow_chunk(frame)
+                if name not in writers:
+                    writers[name] = pq.ParquetWriter(output_dir / path.name, table.schema)
+                writers[name].write_table(table)
+                totals[name] += len(frame)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return totals['rigs'], totals['requests']
+
+if __name__ == "__main__":
+    # python rig_sample.py <output_dir> <num_rigs> [requests_per_rig] [seed]
+    import sys
+    import time
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python rig_sample.py <output_dir> <num_rigs> [requests_per_rig] [seed]")
+    num_requests_per_rig = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    started = time.perf_counter()
+    num_rigs, num_requests = write_sample_data(sys.argv[1], int(sys.argv[2]), num_requests_per_rig, seed)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {num_rigs} rigs and {num_requests} requests to {sys.argv[1]} "
+          f"in {elapsed:.1f}s ({num_requests / elapsed:,.0f} rows/s)")
@@ -0,0 +1,147 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# --- PREFIX SEARCH INDEX ---
+# Request fields searched; the categorical ones are tokenized per category
+# rather than per row
+SEARCH_COLUMNS = ['Request_ID', 'Requestor', 'Action_Requested', 'Rig']
+CATEGORY_FIELDS = ['Requestor', 'Action_Requested', 'Rig']
+# Columns the index reads, filter options included
+INDEX_COLUMNS = SEARCH_COLUMNS + ['Priority']
+# Sorts after every UTF-8 byte, so prefix + PAST_PREFIX bounds a prefix range
+PAST_PREFIX = b"\xff"
+
+def encode(values):
+    # UTF-8 bytes sort in code point order and keep prefixes, at one byte
+    # per character for the usual ASCII IDs
+    return values.cast(pa.binary()).to_numpy(zero_copy_only=False).astype(bytes)
+
+def id_tokens(request_ids):
+    # (tokens, rows): the whole ID, plus its trailing number with and without
+    # leading zeros, so REQ-000123 is found by "req-0", "000123" or "123".
+    # Arrow string kernels keep this vectorized at a million IDs
+    ids = pc.utf8_lower(pa.array(request_ids, type=pa.string(), from_pandas=True))
+    number = pc.struct_field(pc.extract_regex(ids, r'(?P<number>\d+)$'), [0])
+    stripped = pc.utf8_ltrim(number, characters="0")
+    rows = np.arange(len(ids))
+    tokens = [(encode(ids), rows)]
+    for extra, previous in ((number, ids), (stripped, number)):
+        keep = pc.fill_null(pc.and_(pc.not_equal(extra, previous), pc.not_equal(extra, "")), False)
+        tokens.append((encode(extra.filter(keep)), rows[keep.to_numpy(zero_copy_only=False)]))
+    return tokens
+
+def category_tokens(categories):
+    # (tokens, codes) for the words of every category value, so "Deepwater
+    # Horizon" is found by either word
+    words = (pd.Series(categories.astype(str), dtype=object).str.lower().str.split()
+             .explode().dropna().reset_index().drop_duplicates())
+    return encode(pa.array(words.iloc[:, 1], type=pa.string())), words.iloc[:, 0].to_numpy()
+
+def concat_ranges(starts, ends):
+    # np.r_ of many start:end slices without a Python loop
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    return offsets + np.arange(lengths.sum())
+
+def union(parts, num_rows):
+    # Sorted distinct rows of several position arrays
+    if sum(len(part) for part in parts) * 16 < num_rows:
+        return np.unique(np.concatenate(parts))
+    # Large results: a mask avoids sorting them
+    mask = np.zeros(num_rows, dtype=bool)
+    for part in parts:
+        mask[part] = True
+    return np.flatnonzero(mask)
+
+def filter_options(rigs, priorities):
+    # Choices of the sidebar filters
+    return {
+        'Rig_Status': list(rigs['Rig_Status'].unique()),
+        'Rig': sorted(rigs['Rig'].unique()),
+        'Priority': list(priorities)
+    }
+
+def build_postings(requests):
+    # (keys, refs, group rows, group bounds) of a SearchIndex
+    keys, refs = [], []
+    for tokens, rows in id_tokens(requests['Request_ID']):
+        keys.append(tokens)
+        refs.append(rows)
+
+    group_rows, group_starts = [], []
+    offset = 0
+    for col in CATEGORY_FIELDS:
+        values = requests[col].astype('category')
+        codes = values.cat.codes.to_numpy()
+        coded = np.flatnonzero(codes >= 0)
+        group_rows.append(coded[np.argsort(codes[coded], kind='stable')])
+        counts = np.bincount(codes[coded], minlength=len(values.cat.categories))
+        group_starts.append(offset + np.r_[0, np.cumsum(counts)[:-1]])
+        offset += len(coded)
+        first_group = sum(len(starts) for starts in group_starts[:-1])
+        tokens, token_codes = category_tokens(values.cat.categories)
+        keys.append(tokens)
+        # Negative refs are groups: -1 is group 0
+        refs.append(-(first_group + token_codes + 1))
+    group_rows = np.concatenate(group_rows)
+    group_bounds = np.r_[np.concatenate(group_starts), len(group_rows)]
+
+    keys = np.concatenate(keys)
+    order = np.argsort(keys, kind='stable')
+    return keys[order], np.concatenate(refs)[order], group_rows, group_bounds
+
+class SearchIndex:
+    # Sorted token array over the searched fields. A query term is a prefix,
+    # so its matches are one contiguous slice found by two binary searches.
+    # Request_ID tokens point at their row directly; category tokens point
+    # at a group (one category of one field) whose rows are a slice of one
+    # shared array, sorted by category code. Built once per dataset version.
+    def __init__(self, requests, rigs):
+        self.requests = requests
+        # Filter choices come with the index instead of being rebuilt per rerun
+        priority = requests['Priority']
+        codes = priority.cat.codes.to_numpy()
+        present = np.bincount(codes[codes >= 0], minlength=len(priority.cat.categories)) > 0
+        self.options = filter_options(rigs, priority.cat.categories[present])
+
+    @cached_property
+    def postings(self):
+        # Tokens are only needed once someone searches, so versions nobody
+        # searches skip building them
+        return build_postings(self.requests)
+
+    def term_rows(self, term):
+        # Sorted rows with a token starting with term
+        keys, refs, group_rows, group_bounds = self.postings
+        prefix = term.encode()
+        # Fixed-width keys: longer prefixes match nothing, and a full-width one
+        # only itself, since numpy would truncate the probe to the key width
+        if len(prefix) > keys.itemsize:
+            return np.zeros(0, dtype=np.intp)
+        lo = np.searchsorted(keys, prefix)
+        if len(prefix) == keys.itemsize:
+            hi = np.searchsorted(keys, prefix, side='right')
+        else:
+            hi = np.searchsorted(keys, prefix + PAST_PREFIX)
+        refs = refs[lo:hi]
+        groups = np.unique(-refs[refs < 0] - 1)
+        if not len(groups):
+            return np.sort(refs)
+        grouped = group_rows[concat_ranges(group_bounds[groups], group_bounds[groups + 1])]
+        return union([refs[refs >= 0], grouped], len(self.requests))
+
+    def search(self, query):
+        # Sorted row positions matching every whitespace-separated term of
+        # query, each in any field; None for a blank query
+        terms = sorted(set(query.lower().split()))
+        if not terms:
+            return None
+        matches = sorted((self.term_rows(term) for term in terms), key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+import rig_dataset
+import rig_index
+import rig_ingest
+import rig_metrics
+import rig_store
+
+# --- ARROW IPC SNAPSHOTS ---
+# Each dataset version is published once as a directory of uncompressed Arrow
+# IPC files that every dashboard process on the host memory-maps. The columns
+# then live once, in the OS page cache, instead of once per worker, and a new
+# worker maps an existing version in milliseconds instead of parsing it.
+SNAPSHOT_DIR = Path("snapshots")
+# Published versions kept on disk; processes still mapping an older one keep
+# its pages until they let go, even after the files are removed
+KEEP_SNAPSHOTS = 3
+
+def version_stamp(version):
+    # Newest modification time among the version's (mtime_ns, size) file
+    # signatures. It grows with every data change and, like the name, is the
+    # same in every worker. A plain integer version is its own stamp
+    if isinstance(version, int):
+        return version
+    if not isinstance(version, tuple):
+        return 0
+    return max((part[0] for part in version if isinstance(part, tuple) and part and isinstance(part[0], int)),
+               default=0)
+
+def snapshot_name(version):
+    # Versions are built from file signatures, so every worker on the host
+    # derives the same name for the same data. The stamp in front orders the
+    # snapshots by data version for pruning
+    digest = hashlib.sha1(repr(version).encode()).hexdigest()[:16]
+    return f"{version_stamp(version):020d}-{digest}"
+
+def snapshot_order(name):
+    # Snapshots named before the stamp was added sort first
+    stamp, sep, _ = name.partition("-")
+    return int(stamp) if sep and stamp.isdigit() else -1
+
+def snapshot_path(version, directory=SNAPSHOT_DIR):
+    return Path(directory) / snapshot_name(version)
+
+# --- WRITING ---
+def write_table(path, table):
+    # One record batch, so each column maps onto one contiguous buffer
+    with ipc.new_file(str(path), table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+
+def frame_table(frame, metadata=None):
+    # Arrow packs booleans into bits, which pandas would unpack into a private
+    # copy; stored as uint8 they map straight back onto numpy bools
+    frame = frame.astype({col: 'uint8' for col in rig_store.BOOL_COLUMNS if col in frame.columns})
+    table = pa.Table.from_pandas(frame.reset_index(drop=True), preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({**table.schema.metadata, **metadata})
+    return table
+
+def feed_metadata(position):
+    if position is None:
+        return None
+    return {b'feed_offset': str(position.offset).encode(),
+            b'feed_header': position.header.hex().encode(),
+            b'feed_digest': position.digest.hex().encode()}
+
+def publish(dataset, directory=SNAPSHOT_DIR):
+    # Written under a temporary name and renamed into place in one step, so
+    # other workers see a complete snapshot or none. When two workers publish
+    # the same version at once, the first rename wins
+    directory = Path(directory)
+    path = snapshot_path(dataset.version, directory)
+    if path.exists():
+        return path
+    directory.mkdir(exist_ok=True)
+    tmp_path = directory / f".{path.name}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir()
+    windows, due_index = dataset.windows, dataset.due_index
+    write_table(tmp_path / "rigs.arrow", frame_table(dataset.rigs))
+    write_table(tmp_path / "requests.arrow", frame_table(dataset.requests, feed_metadata(dataset.feed)))
+    write_table(tmp_path / "windows.arrow", pa.table({
+        'starts': windows.starts, 'ends': windows.ends, 'rows': windows.rows}))
+    write_table(tmp_path / "due.arrow", pa.table({'ends': due_index.ends, 'rows': due_index.rows}))
+    write_table(tmp_path / "open_due.arrow", pa.table({
+        'ends': due_index.open_ends, 'rows': due_index.open_rows}))
+    write_table(tmp_path / "rollup.arrow", pa.Table.from_pandas(dataset.rollup.table))
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    prune(directory)
+    return path
+
+def prune(directory=SNAPSHOT_DIR, keep=KEEP_SNAPSHOTS):
+    # Oldest data versions first, by name rather than by file times another
+    # worker may be touching; temporary directories are left to the worker
+    # writing them, and entries pruned by another worker meanwhile are skipped
+    try:
+        names = [entry.name for entry in os.scandir(directory)
+                 if entry.is_dir() and not entry.name.startswith(".")]
+    except FileNotFoundError:
+        return
+    published = sorted(names, key=lambda name: (snapshot_order(name), name))
+    for name in published[:max(0, len(published) - keep)]:
+        shutil.rmtree(Path(directory) / name, ignore_errors=True)
+
+# --- MAPPING ---
+def map_table(path):
+    return ipc.open_file(pa.memory_map(str(path))).read_all()
+
+def column_array(table, name):
+    # Zero-copy view of a primitive column
+    column = table.column(name)
+    return column.chunk(0).to_numpy() if column.num_chunks == 1 else column.to_numpy()
+
+def map_frame(table):
+    # Strings stay Arrow-backed, numbers, dates and category codes are views
+    # of the mapped file, and booleans are uint8 viewed as bool. Built with
+    # copy=False, every column keeps its own block; rows are then sliced
+    # with rig_store.take_rows, which never merges them out of the map
+    frame = table.to_pandas(split_blocks=True, types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+    columns = {col: frame[col] for col in frame.columns}
+    for col in rig_store.BOOL_COLUMNS:
+        if col in columns:
+            columns[col] = pd.Series(columns[col].to_numpy().view(bool), name=col)
+    return pd.DataFrame(columns, copy=False)
+
+def feed_position(metadata):
+    # Snapshots from before the digest have no usable position; the feed is then read in full
+    if b'feed_digest' not in metadata:
+        return None
+    return rig_ingest.FeedPosition(int(metadata[b'feed_offset']), bytes.fromhex(metadata[b'feed_header'].decode()),
+                                   bytes.fromhex(metadata[b'feed_digest'].decode()))
+
+def open_snapshot(version, directory=SNAPSHOT_DIR):
+    # Dataset mapped from the published snapshot of version, or None if no
+    # worker has published it yet
+    path = snapshot_path(version, directory)
+    try:
+        tables = {name: map_table(path / f"{name}.arrow")
+                  for name in ('rigs', 'requests', 'windows', 'due', 'open_due', 'rollup')}
+    except FileNotFoundError:
+        # Not published, or pruned between the check and the mapping
+        return None
+    requests = tables['requests']
+    windows, due, open_due = tables['windows'], tables['due'], tables['open_due']
+    indexes = (
+        rig_index.WindowIndex.from_sorted(
+            column_array(windows, 'starts'), column_array(windows, 'ends'), column_array(windows, 'rows')),
+        rig_index.DueDateIndex.from_sorted(
+            column_array(due, 'ends'), column_array(due, 'rows'),
+            column_array(open_due, 'ends'), column_array(open_due, 'rows')),
+        # Rig x month counts; small, so copied
+        rig_metrics.KpiRollup(tables['rollup'].to_pandas())
+    )
+    return rig_dataset.Dataset(version, map_frame(tables['rigs']), map_frame(requests),
+                               feed_position(requests.schema.metadata), indexes)
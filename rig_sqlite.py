@@ -0,0 +1,319 @@
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+import rig_metrics
+import rig_store
+
+# --- SQLITE STORAGE BACKEND ---
+# Optional alternative to the Parquet tables: WAL mode lets sessions read
+# while one writer commits, filters run as indexed SQL predicates, and
+# changes are row-level upserts instead of whole-file rewrites.
+DB_FILE = Path("rig_data.db")
+BUSY_TIMEOUT_SECONDS = 30
+# Fixed-width ISO text sorts chronologically, so range predicates use the index
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS rigs (
+    Rig TEXT PRIMARY KEY,
+    Rig_Start TEXT,
+    Rig_End TEXT,
+    Rig_Status TEXT
+);
+CREATE TABLE IF NOT EXISTS requests (
+    Request_ID TEXT PRIMARY KEY,
+    Rig TEXT NOT NULL,
+    Action_Requested TEXT,
+    Requestor TEXT,
+    Start_Date TEXT,
+    End_Date TEXT,
+    Duration_Days INTEGER,
+    Action_Doable INTEGER,
+    Action_Complete INTEGER,
+    Response_Provided INTEGER,
+    Priority TEXT,
+    Cost_Estimate REAL,
+    Team_Size INTEGER,
+    Risk_Level TEXT,
+    Environmental_Impact TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_requests_rig ON requests(Rig);
+CREATE INDEX IF NOT EXISTS idx_requests_priority ON requests(Priority);
+CREATE INDEX IF NOT EXISTS idx_requests_end_date ON requests(End_Date);
+CREATE INDEX IF NOT EXISTS idx_rigs_status ON rigs(Rig_Status);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+TABLE_COLUMNS = {'rigs': rig_store.RIG_COLUMNS, 'requests': rig_store.REQUEST_COLUMNS}
+TABLE_KEYS = {'rigs': 'Rig', 'requests': 'Request_ID'}
+
+# --- CONNECTIONS ---
+@contextmanager
+def connection(path=DB_FILE):
+    # Autocommit mode; writers open their own IMMEDIATE transaction
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+@contextmanager
+def write_transaction(path=DB_FILE):
+    # Takes the write lock up front so concurrent writers queue on
+    # busy_timeout instead of failing mid-transaction; every commit bumps
+    # the data version readers cache on
+    with connection(path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+def initialize(path=DB_FILE):
+    with connection(path) as conn:
+        conn.executescript(SCHEMA_SQL)
+
+def database_exists(path=DB_FILE):
+    if not Path(path).exists():
+        return False
+    with connection(path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {'rigs', 'requests', 'meta'} <= tables and conn.execute(
+            "SELECT COUNT(*) FROM rigs").fetchone()[0] > 0
+
+def data_version(path=DB_FILE):
+    with connection(path) as conn:
+        return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+# --- WRITES ---
+def to_records(frame, columns):
+    values = []
+    for col in columns:
+        series = frame[col]
+        if col in rig_store.DATE_COLUMNS:
+            series = pd.to_datetime(series).dt.strftime(TIMESTAMP_FORMAT)
+        elif col in rig_store.BOOL_COLUMNS:
+            series = series.astype(bool).astype('int64')
+        series = series.astype(object)
+        values.append(series.where(series.notna(), None))
+    return list(zip(*values))
+
+def upsert(conn, table, frame):
+    columns = [col for col in TABLE_COLUMNS[table] if col in frame.columns]
+    key = TABLE_KEYS[table]
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col != key)
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT({key}) DO UPDATE SET {updates}",
+        to_records(frame, columns)
+    )
+
+def check_unique(frame, key):
+    # Upserts are keyed on these columns, so duplicates would silently collapse
+    duplicated = frame[key][frame[key].duplicated()].astype(str).unique()
+    if len(duplicated):
+        raise ValueError(f"Duplicate {key} values: {', '.join(duplicated[:10])}")
+
+def write_tables(rigs, requests, path=DB_FILE):
+    # Full replacement, e.g. for sample data; still a single transaction
+    check_unique(rigs, 'Rig')
+    check_unique(requests, 'Request_ID')
+    initialize(path)
+    with write_transaction(path) as conn:
+        conn.execute("DELETE FROM requests")
+        conn.execute("DELETE FROM rigs")
+        upsert(conn, 'rigs', rigs)
+        upsert(conn, 'requests', requests)
+
+def upsert_rows(rigs=None, requests=None, path=DB_FILE):
+    # Row-level inserts/updates keyed by Rig and Request_ID
+    for frame, key in ((rigs, 'Rig'), (requests, 'Request_ID')):
+        if frame is not None:
+            check_unique(frame, key)
+    initialize(path)
+    with write_transaction(path) as conn:
+        if rigs is not None and len(rigs):
+            upsert(conn, 'rigs', rigs)
+        if requests is not None and len(requests):
+            upsert(conn, 'requests', requests)
+
+def update_request(request_id, changes, path=DB_FILE):
+    unknown = set(changes) - set(rig_store.REQUEST_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown request columns: {', '.join(sorted(unknown))}")
+    row = pd.DataFrame([changes])
+    columns = list(changes)
+    assignments = ", ".join(f"{col} = ?" for col in columns)
+    with write_transaction(path) as conn:
+        cursor = conn.execute(
+            f"UPDATE requests SET {assignments} WHERE Request_ID = ?",
+            to_records(row, columns)[0] + (str(request_id),)
+        )
+        if cursor.rowcount == 0:
+            raise KeyError(f"No request with Request_ID {request_id}")
+
+# --- READS WITH FILTER PUSHDOWN ---
+def sql_timestamp(value):
+    return pd.Timestamp(value).strftime(TIMESTAMP_FORMAT)
+
+def in_clause(column, values):
+    return f"{column} IN ({', '.join('?' * len(values))})", [str(value) for value in values]
+
+def filter_clause(statuses=None, rigs=None, priorities=None, date_mode=None, start=None, end=None,
+                  active_at=None):
+    # Same semantics as the in-memory filters, expressed as indexed predicates
+    clauses, params = [], []
+    if statuses:
+        clause, values = in_clause("Rig_Status", list(statuses))
+        clauses.append(f"r.Rig IN (SELECT Rig FROM rigs WHERE {clause})")
+        params += values
+    if rigs:
+        clause, values = in_clause("r.Rig", list(rigs))
+        clauses.append(clause)
+        params += values
+    if priorities:
+        clause, values = in_clause("r.Priority", list(priorities))
+        clauses.append(clause)
+        params += values
+    if date_mode == 'active' and active_at is not None:
+        clauses.append("r.Start_Date <= ? AND r.End_Date >= ?")
+        params += [sql_timestamp(active_at)] * 2
+    elif date_mode == 'contained' and start is not None:
+        clauses.append("r.Start_Date >= ? AND r.End_Date <= ?")
+        params += [sql_timestamp(start), sql_timestamp(end)]
+    elif date_mode == 'overlapping' and start is not None:
+        clauses.append("r.Start_Date <= ? AND r.End_Date >= ?")
+        params += [sql_timestamp(end), sql_timestamp(start)]
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return where, params
+
+def query_frame(sql, params=(), path=DB_FILE):
+    with connection(path) as conn:
+        frame = pd.read_sql_query(sql, conn, params=list(params))
+    return rig_store.apply_schema(frame, copy=False)
+
+def read_rigs(path=DB_FILE):
+    return query_frame(f"SELECT {', '.join(rig_store.RIG_COLUMNS)} FROM rigs ORDER BY rowid", path=path)
+
+def read_requests(columns=None, path=DB_FILE, **filters):
+    columns = columns or rig_store.REQUEST_COLUMNS
+    where, params = filter_clause(**filters)
+    select = ", ".join(f"r.{col}" for col in columns)
+    return query_frame(f"SELECT {select} FROM requests r{where} ORDER BY r.rowid", params, path)
+
+def read_due(start, end, open_only=True, columns=None, path=DB_FILE):
+    # End_Date window through idx_requests_end_date, earliest first
+    columns = columns or rig_store.DASHBOARD_COLUMNS
+    select = ", ".join(f"r.{col}" for col in columns)
+    open_clause = " AND r.Action_Complete = 0" if open_only else ""
+    return query_frame(
+        f"SELECT {select} FROM requests r WHERE r.End_Date >= ? AND r.End_Date <= ?{open_clause} "
+        f"ORDER BY r.End_Date",
+        [sql_timestamp(start), sql_timestamp(end)], path
+    )
+
+def distinct_values(column, path=DB_FILE):
+    with connection(path) as conn:
+        return [row[0] for row in conn.execute(
+            f"SELECT DISTINCT {column} FROM requests WHERE {column} IS NOT NULL")]
+
+def rig_names(path=DB_FILE):
+    with connection(path) as conn:
+        return {row[0] for row in conn.execute("SELECT Rig FROM rigs")}
+
+def priority_levels(path=DB_FILE):
+    # Severity order first, as for the ordered Priority category
+    present = pd.Series(distinct_values('Priority', path), dtype=object)
+    return list(rig_store.ordered_category(present, rig_store.LEVEL_ORDER).sort_values())
+
+def read_daily_counts(path=DB_FILE):
+    # Input for rig_timeline's bucket pyramid, aggregated inside SQLite
+    counts = query_frame(
+        "SELECT Rig, substr(Start_Date, 1, 10) AS Bucket, Priority, COUNT(*) AS Count "
+        "FROM requests GROUP BY Rig, Bucket, Priority", path=path)
+    counts['Bucket'] = pd.to_datetime(counts['Bucket'])
+    return counts
+
+def compute_kpis(now=None, path=DB_FILE):
+    # rig_metrics.compute_kpis equivalent as SQL aggregates
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    month_start = now.normalize().replace(day=1)
+    next_month = month_start + pd.offsets.MonthBegin(1)
+    bounds = [sql_timestamp(month_start), sql_timestamp(next_month)]
+    with connection(path) as conn:
+        total_rigs, active_rigs = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(Rig_Status = 'Active'), 0) FROM rigs").fetchone()
+        total, completed, monthly_requests, monthly_completed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(Action_Complete), 0), "
+            "COALESCE(SUM(Start_Date >= ? AND Start_Date < ?), 0), "
+            "COALESCE(SUM(Action_Complete AND End_Date >= ? AND End_Date < ?), 0) FROM requests",
+            bounds + bounds).fetchone()
+        upcoming = conn.execute(
+            "SELECT COUNT(*) FROM requests WHERE End_Date > ? AND End_Date <= ? AND Action_Complete = 0",
+            [sql_timestamp(now), sql_timestamp(now + pd.Timedelta(days=rig_metrics.UPCOMING_DAYS))]
+        ).fetchone()[0]
+        overdue = conn.execute(
+            "SELECT COUNT(*) FROM requests WHERE End_Date < ? AND Action_Complete = 0",
+            [sql_timestamp(now)]).fetchone()[0]
+    return rig_metrics.KpiSummary(
+        total_rigs=total_rigs,
+        active_rigs=active_rigs,
+        total_requests=total,
+        completed_requests=completed,
+        completion_rate=rig_metrics.completion_rate(completed, total),
+        monthly_requests=monthly_requests,
+        monthly_completed=monthly_completed,
+        upcoming_tasks=upcoming,
+        overdue_tasks=overdue
+    )
+
+# --- MIGRATION, CSV IMPORT / EXPORT ---
+def migrate_from_store(path=DB_FILE):
+    # One-shot copy of the Parquet tables, or of the legacy flat file
+    if rig_store.tables_exist():
+        rigs = rig_store.read_table(rig_store.RIGS_FILE)
+        requests = rig_store.read_table(rig_store.REQUESTS_FILE)
+    else:
+        source = rig_store.legacy_source()
+        if source is None:
+            return None
+        rigs, requests = rig_store.split_tables(rig_store.read_flat(source))
+    write_tables(rigs, requests, path)
+    return len(rigs), len(requests)
+
+def import_csv(csv_path, path=DB_FILE):
+    # Upserts rather than replaces, so existing requests are updated in place
+    rigs, requests = rig_store.split_tables(rig_store.import_csv(csv_path))
+    upsert_rows(rigs, requests, path)
+    return len(rigs), len(requests)
+
+def export_csv(csv_path, path=DB_FILE, **filters):
+    flat = rig_store.join_tables(read_rigs(path), read_requests(path=path, **filters))
+    flat.to_csv(csv_path, index=False)
+    return len(flat)
+
+if __name__ == "__main__":
+    # python rig_sqlite.py migrate | import rig_data.csv | export rig_operations.csv
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'migrate' and len(sys.argv) == 2:
+        counts = migrate_from_store()
+        if counts is None:
+            sys.exit("No Parquet tables, rig_data.csv or rig_data.parquet to migrate")
+        print(f"Migrated {counts[0]} rigs and {counts[1]} requests into {DB_FILE}")
+    elif command == 'import' and len(sys.argv) == 3:
+        num_rigs, num_requests = import_csv(sys.argv[2])
+        print(f"Imported {num_rigs} rigs and {num_requests} requests into {DB_FILE}")
+    elif command == 'export' and len(sys.argv) == 3:
+        print(f"Exported {export_csv(sys.argv[2])} requests to {sys.argv[2]}")
+    else:
+        sys.exit("Usage: python rig_sqlite.py migrate | import <file.csv> | export <file.csv>")
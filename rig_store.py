@@ -0,0 +1,165 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# --- STORAGE LOCATIONS ---
+# Parquet tables are the system of record; CSV is only an import/export format
+RIGS_FILE = Path("rigs.parquet")
+REQUESTS_FILE = Path("requests.parquet")
+CSV_FILE = Path("rig_data.csv")
+# Single-table Parquet layout used before rigs and requests were split
+LEGACY_FILE = Path("rig_data.parquet")
+
+# --- SCHEMA ---
+# One row per rig in the rigs table; requests reference it through 'Rig'
+RIG_COLUMNS = ['Rig', 'Rig_Start', 'Rig_End', 'Rig_Status']
+REQUEST_COLUMNS = [
+    'Request_ID', 'Rig', 'Action_Requested', 'Requestor', 'Start_Date', 'End_Date',
+    'Duration_Days', 'Action_Doable', 'Action_Complete', 'Response_Provided', 'Priority',
+    'Cost_Estimate', 'Team_Size', 'Risk_Level', 'Environmental_Impact'
+]
+
+DATE_COLUMNS = ['Rig_Start', 'Rig_End', 'Start_Date', 'End_Date']
+BOOL_COLUMNS = ['Action_Doable', 'Action_Complete', 'Response_Provided']
+INT32_COLUMNS = ['Duration_Days', 'Team_Size']
+CATEGORY_COLUMNS = ['Rig', 'Rig_Status', 'Action_Requested', 'Requestor', 'Environmental_Impact']
+# Ordered so comparisons and sorts follow severity rather than spelling
+LEVEL_ORDER = ['Low', 'Medium', 'High']
+ORDERED_CATEGORY_COLUMNS = {'Priority': LEVEL_ORDER, 'Risk_Level': LEVEL_ORDER}
+
+# Request columns the dashboard actually renders; the rest are only needed for exports
+DASHBOARD_COLUMNS = [
+    'Request_ID', 'Rig', 'Action_Requested', 'Requestor', 'Start_Date', 'End_Date',
+    'Duration_Days', 'Action_Doable', 'Action_Complete', 'Response_Provided', 'Priority',
+    'Cost_Estimate', 'Team_Size'
+]
+
+def parse_bool(series):
+    # CSV round-trips booleans as text, sometimes with mixed case
+    if series.dtype == bool:
+        return series
+    return series.astype(str).str.strip().str.lower().isin(['true', '1', 'yes'])
+
+def ordered_category(series, order):
+    # Values outside the known levels are kept, ranked after them
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.ordered:
+        return series
+    extra = sorted(set(series.dropna().astype(str)) - set(order))
+    return series.astype(pd.CategoricalDtype(order + extra, ordered=True))
+
+def to_int32(series):
+    if series.dtype == 'int32':
+        return series
+    if series.isna().any():
+        return series.astype('Int32')
+    return series.astype('int32')
+
+def apply_schema(df, copy=True):
+    # Converts only columns whose dtype differs; copy=False updates df in place,
+    # which loaders use on frames nobody else holds yet
+    if copy:
+        df = df.copy()
+    for col in DATE_COLUMNS:
+        if col in df.columns and df[col].dtype != 'datetime64[ns]':
+            df[col] = pd.to_datetime(df[col])
+    for col in BOOL_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_bool(df[col])
+    for col in INT32_COLUMNS:
+        if col in df.columns:
+            df[col] = to_int32(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col, order in ORDERED_CATEGORY_COLUMNS.items():
+        if col in df.columns:
+            df[col] = ordered_category(df[col], order)
+    if 'Request_ID' in df.columns and df['Request_ID'].dtype != object:
+        df['Request_ID'] = df['Request_ID'].astype(str)
+    return df
+
+def take_rows(df, positions):
+    # Rows at positions, taken column by column: DataFrame.take first merges
+    # same-dtype columns into one block, which copies a frame mapped from a
+    # snapshot out of the map in every process that slices it
+    return pd.DataFrame({col: df[col].array.take(positions) for col in df.columns},
+                        index=df.index.take(positions), copy=False)
+
+def memory_per_row(df):
+    # Bytes per row for each column, strings and categories included
+    rows = max(len(df), 1)
+    return df.memory_usage(deep=True, index=False) / rows
+
+# --- NORMALIZATION ---
+def split_tables(df):
+    # Flat rows repeat the rig fields on every request; keep them once per rig
+    rigs = df[RIG_COLUMNS].drop_duplicates('Rig').reset_index(drop=True)
+    requests = df[[col for col in REQUEST_COLUMNS if col in df.columns]].reset_index(drop=True)
+    return rigs, requests
+
+def join_tables(rigs, requests):
+    # Flat, one-row-per-request layout used by CSV/Excel exports
+    flat = requests.merge(rigs, on='Rig', how='left')
+    rest = [col for col in flat.columns if col not in RIG_COLUMNS]
+    return flat[RIG_COLUMNS + rest]
+
+# --- COLUMNAR STORAGE ---
+def stored_columns(path):
+    return pq.read_schema(path).names
+
+def read_table(path, columns=None):
+    if columns is not None:
+        # Older files may predate some columns; project onto what is there
+        available = set(stored_columns(path))
+        columns = [col for col in columns if col in available]
+    # Files written before the current schema are upgraded on the way in
+    return apply_schema(pd.read_parquet(path, columns=columns), copy=False)
+
+def write_table(df, path):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    apply_schema(df).to_parquet(tmp_path, index=False)
+    # Readers never observe a half-written file
+    os.replace(tmp_path, path)
+
+def write_tables(rigs, requests, rigs_path=RIGS_FILE, requests_path=REQUESTS_FILE):
+    write_table(requests, requests_path)
+    write_table(rigs, rigs_path)
+
+def tables_exist(rigs_path=RIGS_FILE, requests_path=REQUESTS_FILE):
+    return Path(rigs_path).exists() and Path(requests_path).exists()
+
+# --- CSV IMPORT ---
+def import_csv(csv_path=CSV_FILE):
+    return apply_schema(pd.read_csv(csv_path))
+
+def legacy_source():
+    for path in (LEGACY_FILE, CSV_FILE):
+        if path.exists():
+            return path
+    return None
+
+def read_flat(source):
+    # Flat CSV or single-table Parquet file, one row per request
+    source = Path(source)
+    if source.suffix == '.parquet':
+        return apply_schema(pd.read_parquet(source))
+    return import_csv(source)
+
+def migrate(source, rigs_path=RIGS_FILE, requests_path=REQUESTS_FILE):
+    # One-shot conversion of a flat CSV or single-table Parquet file
+    rigs, requests = split_tables(read_flat(source))
+    write_tables(rigs, requests, rigs_path, requests_path)
+    return len(rigs), len(requests)
+
+if __name__ == "__main__":
+    # One-shot migration: python rig_store.py [source.csv|source.parquet]
+    import sys
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else legacy_source()
+    if source is None:
+        sys.exit("No rig_data.csv or rig_data.parquet to migrate")
+    num_rigs, num_requests = migrate(source)
+    print(f"Migrated {num_rigs} rigs and {num_requests} requests from {source} "
+          f"to {RIGS_FILE} and {REQUESTS_FILE}")
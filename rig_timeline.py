@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+GANTT_COLUMNS = ['Task', 'Start', 'Finish', 'Resource', 'Details', 'ID', 'Priority']
+# Request columns the timeline reads, directly or through the pyramid
+REQUEST_COLUMNS = ['Request_ID', 'Rig', 'Action_Requested', 'Requestor', 'Start_Date', 'End_Date', 'Priority']
+
+# --- LEVEL OF DETAIL ---
+# Dominance ties resolve in this order
+PRIORITY_LEVELS = ['High', 'Medium', 'Low']
+BUCKET_WIDTHS = {'day': pd.Timedelta(days=1), 'week': pd.Timedelta(days=7)}
+BUCKET_LABELS = {'day': "Daily", 'week': "Weekly"}
+# Per-request bars are drawn only up to this many requests in view
+DETAIL_LIMIT = 2000
+# Wider visible ranges than this fall back from daily to weekly buckets
+DAILY_SPAN_DAYS = 90
+
+# --- GANTT FRAME CONSTRUCTION ---
+def build_rig_bars(rigs, rigs_in_view):
+    # Main rig operational period, one bar per rig with bars in view
+    rig_rows = rigs[rigs['Rig'].isin(rigs_in_view)]
+    rig_names = rig_rows['Rig'].astype(str)
+    return pd.DataFrame({
+        'Task': rig_names,
+        'Start': rig_rows['Rig_Start'],
+        'Finish': rig_rows['Rig_End'],
+        'Resource': "Rig Operation",
+        'Details': "Status: " + rig_rows['Rig_Status'].astype(str),
+        'ID': rig_names,
+        'Priority': ""
+    })
+
+def build_gantt_frame(rigs, requests):
+    rig_bars = build_rig_bars(rigs, requests['Rig'])
+
+    # Individual requests, built column-wise instead of row by row
+    actions = requests['Action_Requested'].astype(str)
+    request_bars = pd.DataFrame({
+        'Task': requests['Rig'].astype(str),
+        'Start': requests['Start_Date'],
+        'Finish': requests['End_Date'],
+        'Resource': actions,
+        'Details': requests['Requestor'].astype(str) + " | " + actions,
+        'ID': requests['Request_ID'].astype(str),
+        'Priority': requests['Priority'].astype(str)
+    })
+
+    return pd.concat([rig_bars, request_bars], ignore_index=True)[GANTT_COLUMNS]
+
+# --- TIME-BUCKET PYRAMID ---
+def daily_counts(requests):
+    # Long form: one (Rig, Bucket, Priority, Count) row per non-empty day
+    day = requests['Start_Date'].dt.floor('D').rename('Bucket')
+    return (requests.groupby([requests['Rig'].astype(str), day, requests['Priority'].astype(str)])
+            .size()
+            .rename('Count')
+            .reset_index())
+
+def build_bucket_pyramid(requests):
+    return pyramid_from_daily_counts(daily_counts(requests))
+
+def pyramid_from_daily_counts(counts):
+    # Per rig, per day request counts split by priority; the weekly level is
+    # rolled up from the daily one so neither level rescans the raw requests
+    daily = (counts.astype({'Rig': str, 'Priority': str})
+             .pivot_table(index=['Rig', 'Bucket'], columns='Priority', values='Count',
+                          aggfunc='sum', fill_value=0))
+    priorities = PRIORITY_LEVELS + [col for col in daily.columns if col not in PRIORITY_LEVELS]
+    daily = daily.reindex(columns=priorities, fill_value=0).reset_index()
+    daily.columns.name = None
+
+    week = daily['Bucket'] - pd.to_timedelta(daily['Bucket'].dt.dayofweek, unit='D')
+    weekly = daily.groupby([daily['Rig'], week])[priorities].sum().reset_index()
+
+    return {'day': daily, 'week': weekly}
+
+def choose_level(num_requests, span_days=None):
+    if num_requests <= DETAIL_LIMIT:
+        return 'request'
+    if span_days is not None and span_days <= DAILY_SPAN_DAYS:
+        return 'day'
+    return 'week'
+
+def choose_buckets(pyramid, num_requests, span_days=None, **selection):
+    # Finest level that fits the bar budget: per request, then daily, then weekly
+    level = choose_level(num_requests, span_days)
+    if level == 'request':
+        return level, None
+    buckets = select_buckets(pyramid, level, **selection)
+    if level == 'day' and len(buckets) > DETAIL_LIMIT:
+        level = 'week'
+        buckets = select_buckets(pyramid, level, **selection)
+    return level, buckets
+
+def select_buckets(pyramid, level, rigs=None, priorities=None, start=None, end=None):
+    buckets = pyramid[level]
+    width = BUCKET_WIDTHS[level]
+    mask = np.ones(len(buckets), dtype=bool)
+    if rigs is not None:
+        mask &= buckets['Rig'].isin(rigs).to_numpy()
+    if start is not None:
+        mask &= (buckets['Bucket'] + width > start).to_numpy()
+    if end is not None:
+        mask &= (buckets['Bucket'] <= end).to_numpy()
+    buckets = buckets[mask]
+
+    columns = [col for col in buckets.columns if col not in ('Rig', 'Bucket')]
+    if priorities:
+        columns = [col for col in columns if col in priorities]
+    if not columns:
+        return pd.DataFrame(columns=['Rig', 'Bucket', 'Count', 'Dominant', 'Breakdown'])
+    total = buckets[columns].sum(axis=1)
+    buckets = buckets[total > 0]
+    counts = buckets[columns]
+    selected = buckets[['Rig', 'Bucket']].copy()
+    selected['Count'] = total[total > 0]
+    selected['Dominant'] = counts.idxmax(axis=1)
+    # "High: 3, Medium: 0, Low: 5" built column-wise
+    selected['Breakdown'] = f"{columns[0]}: " + counts[columns[0]].astype(str)
+    for col in columns[1:]:
+        selected['Breakdown'] += f", {col}: " + counts[col].astype(str)
+    return selected
+
+def build_bucket_frame(rigs, buckets, level):
+    # Aggregate bars drawn in place of per-request bars for wide views
+    rig_bars = build_rig_bars(rigs, buckets['Rig'])
+
+    label = BUCKET_LABELS[level]
+    bucket_bars = pd.DataFrame({
+        'Task': buckets['Rig'],
+        'Start': buckets['Bucket'],
+        'Finish': buckets['Bucket'] + BUCKET_WIDTHS[level],
+        'Resource': f"{label} requests - " + buckets['Dominant'].astype(str) + " priority",
+        'Details': buckets['Count'].astype(str) + " requests | " + buckets['Breakdown'],
+        'ID': label + " " + buckets['Bucket'].dt.strftime('%Y-%m-%d'),
+        'Priority': buckets['Dominant'].astype(str)
+    })
+
+    return pd.concat([rig_bars, bucket_bars], ignore_index=True)[GANTT_COLUMNS]
+
+# --- TIMELINE FIGURE ---
+def build_timeline_figure(gantt_df):
+    fig = px.timeline(
+        gantt_df,
+        x_start="Start",
+        x_end="Finish",
+        y="Task",
+        color="Resource",
+        hover_data={"Details": True, "Resource": True, "Start": False, "Finish": False, "ID": True, "Priority": True},
+        title="Rig and Request Timeline",
+        height=600
+    )
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        hovermode='closest'
+    )
+    return fig
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+import rig_index
+import rig_store
+
+# Columns of the detailed request table, in display order
+DETAIL_COLUMNS = [
+    "Rig", "Request_ID", "Action_Requested", "Requestor", "Start_Date", "End_Date",
+    "Duration_Days", "Priority", "Action_Doable", "Action_Complete", "Response_Provided"
+]
+
+# Request columns filter_positions reads; rig status comes from the rigs table
+FILTER_COLUMNS = ['Rig', 'Priority', 'Start_Date', 'End_Date']
+
+# --- FILTERED VIEW ---
+def view_rig_names(rigs, statuses=None, rig_names=None):
+    # Rigs left after the status and rig filters
+    names = rigs['Rig']
+    if statuses:
+        names = names[rigs['Rig_Status'].isin(statuses)]
+    if rig_names:
+        names = names[names.isin(rig_names)]
+    return names
+
+def filter_positions(requests, windows, view_rigs=None, priorities=None, date_mode=None,
+                     start=None, end=None, active_at=None):
+    # Date filter first: the window index narrows the candidates in
+    # O(log n + k) before any column masks run. Filters narrow an array of
+    # row positions; None means every row is kept.
+    rows = None
+    if date_mode == 'active' and active_at is not None:
+        rows = windows.active_at(active_at)
+    elif date_mode is not None and start is not None:
+        rows = windows.query(date_mode, start, end)
+
+    keep = np.ones(len(requests) if rows is None else len(rows), dtype=bool)
+    if view_rigs is not None:
+        keep &= rig_index.category_mask(requests['Rig'], view_rigs, rows)
+    if priorities:
+        keep &= rig_index.category_mask(requests['Priority'], priorities, rows)
+
+    if rows is None:
+        return None if keep.all() else np.flatnonzero(keep)
+    return rows[keep]
+
+def take_rows(requests, positions):
+    # The frame is sliced once, at the end
+    return requests if positions is None else rig_store.take_rows(requests, positions)
+
+# --- ALERT AND WEEKLY TABLES ---
+def group_alerts_by_rig(tasks):
+    grouped = tasks.assign(High=tasks['Priority'] == 'High').groupby('Rig', observed=True).agg(
+        Urgent=('Request_ID', 'count'),
+        High_Priority=('High', 'sum'),
+        Next_Due=('End_Date', 'min')
+    )
+    grouped['Next_Due'] = grouped['Next_Due'].dt.strftime('%Y-%m-%d %H:%M')
+    return grouped.sort_values(['Next_Due', 'Urgent'], ascending=[True, False])
+
+def weekly_summary(tasks):
+    summary = tasks.groupby('Rig', observed=True).agg({
+        'Action_Requested': 'count',
+        'Action_Complete': 'sum'
+    }).rename(columns={'Action_Requested': 'Total', 'Action_Complete': 'Completed'})
+
+    summary['Completion'] = (summary['Completed'] / summary['Total'] * 100).round(1)
+    return summary
+
+# --- DETAILED REQUEST VIEW ---
+def sort_order(frame, column, descending=False):
+    # Row positions in display order; categoricals sort on their integer
+    # codes, which follow category order (severity for Priority)
+    series = frame[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.cat.codes.to_numpy()
+    else:
+        values = series.to_numpy()
+    order = np.argsort(values, kind='stable')
+    return order[::-1] if descending else order
+
+def page_count(num_rows, page_size):
+    return max(1, -(-num_rows // page_size))
+
+def view_ranks(order):
+    # Inverse of a sort order: ranks[i] is the place of view row i
+    ranks = np.empty(len(order), dtype=np.intp)
+    ranks[order] = np.arange(len(order))
+    return ranks
+
+def find_request(position, view_rows, ranks):
+    # Place in the sorted view of the request at a frame position (from a
+    # Request_ID lookup), or None if it is not in the view. view_rows are the
+    # sorted frame positions in view, None for the whole frame; a binary
+    # search maps the position to its view row
+    if position is None:
+        return None
+    if view_rows is None:
+        return int(ranks[position]) if position < len(ranks) else None
+    row = np.searchsorted(view_rows, position)
+    if row == len(view_rows) or view_rows[row] != position:
+        return None
+    return int(ranks[row])
+
+def detailed_view(requests, rigs):
+    view = requests[DETAIL_COLUMNS].copy()
+    view['Rig_Status'] = view['Rig'].map(rigs.set_index('Rig')['Rig_Status'])
+
+    # Format for display
+    view['Start_Date'] = view['Start_Date'].dt.strftime('%Y-%m-%d')
+    view['End_Date'] = view['End_Date'].dt.strftime('%Y-%m-%d')
+    view['Action_Doable'] = view['Action_Doable'].map({True: '✅', False: '❌'})
+    view['Action_Complete'] = view['Action_Complete'].map({True: '✅', False: '⏳'})
+    view['Response_Provided'] = view['Response_Provided'].map({True: '✅', False: '📝'})
+    return view
@@ -0,0 +1,144 @@
+import threading
+import time
+from pathlib import Path
+
+try:
+    # Ships with Streamlit on Linux, where it watches through inotify
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# --- DATA SOURCE WATCHER ---
+# Signatures are re-checked at least this often, events or not
+POLL_SECONDS = 2.0
+# How often the scheduler looks for sessions that are due a refresh
+TICK_SECONDS = 0.5
+
+def signature(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class WakeOnChange(FileSystemEventHandler):
+    def __init__(self, paths, wake):
+        self.paths = {str(path) for path in paths}
+        self.wake = wake
+
+    def on_any_event(self, event):
+        # Atomic rewrites show up as a move onto the watched name
+        if event.src_path in self.paths or getattr(event, 'dest_path', None) in self.paths:
+            self.wake.set()
+
+class DataWatcher:
+    # Bumps version whenever a watched file's mtime or size changes. inotify
+    # events wake the check immediately; the polling loop is the fallback
+    # where no events arrive (no watchdog, watch limits, network mounts).
+    def __init__(self, paths, poll_seconds=POLL_SECONDS):
+        self.paths = [Path(path).resolve() for path in paths]
+        self.poll_seconds = poll_seconds
+        self.version = 0
+        self._signatures = {path: signature(path) for path in self.paths}
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self.mode = 'polling'
+        if Observer is not None:
+            try:
+                observer = Observer()
+                handler = WakeOnChange(self.paths, self._wake)
+                for folder in {path.parent for path in self.paths}:
+                    observer.schedule(handler, str(folder), recursive=False)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+                self.mode = 'inotify'
+            except OSError:
+                pass
+        threading.Thread(target=self._run, name="rig-data-watcher", daemon=True).start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            self.check()
+
+    def stop(self):
+        # Ends the polling thread and the inotify observer
+        self._stopped.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def check(self):
+        # Only the watcher thread writes; readers just compare version
+        changed = [path for path in self.paths if signature(path) != self._signatures[path]]
+        for path in changed:
+            self._signatures[path] = signature(path)
+        if changed:
+            self.version += 1
+        return changed
+
+# --- SESSION REFRESH ---
+class RefreshScheduler:
+    # Reruns subscribed sessions whose data version is behind the watcher's,
+    # at most once per cadence each. A session subscribes at the end of every
+    # run with the version it rendered, so an idle session costs nothing and
+    # a changed file costs one rerun per open session.
+    def __init__(self, watcher, rerun):
+        self.watcher = watcher
+        # Called with a session id from the scheduler thread
+        self.rerun = rerun
+        self._lock = threading.Lock()
+        # session_id -> (rendered version, earliest refresh time)
+        self._sessions = {}
+        self._stopped = threading.Event()
+        threading.Thread(target=self._run, name="rig-refresh", daemon=True).start()
+
+    def subscribe(self, session_id, version, cadence):
+        with self._lock:
+            self._sessions[session_id] = (version, time.monotonic() + cadence)
+
+    def unsubscribe(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stop(self):
+        # Ends this thread and the watcher's; subscribed sessions are dropped
+        self._stopped.set()
+        self.watcher.stop()
+        with self._lock:
+            self._sessions.clear()
+
+    def _run(self):
+        while not self._stopped.wait(TICK_SECONDS):
+            current, now = self.watcher.version, time.monotonic()
+            with self._lock:
+                due = [session_id for session_id, (version, not_before) in self._sessions.items()
+                       if version != current and now >= not_before]
+                for session_id in due:
+                    # The rerun subscribes again with the version it renders
+                    del self._sessions[session_id]
+            for session_id in due:
+                self.rerun(session_id)
+
+# One scheduler per process, kept here rather than in a Streamlit resource
+# cache: a cached scheduler for other paths, or one dropped by a cache clear,
+# would keep its threads running with no way to reach them
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def shared_scheduler(paths, rerun):
+    # The process's scheduler for paths. Other paths (the backend or feed was
+    # switched) stop the current watcher and scheduler threads first
+    global _scheduler
+    paths = [Path(path).resolve() for path in paths]
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler.watcher.paths != paths:
+            if _scheduler is not None:
+                _scheduler.stop()
+            _scheduler = RefreshScheduler(DataWatcher(paths), rerun)
+        return _scheduler